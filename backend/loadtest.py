@@ -0,0 +1,441 @@
+"""
+API 부하 테스트 도구
+
+main.py의 FastAPI 앱에 실제와 비슷한 요청 조합을 지정한 동시성으로 보내고,
+경로별 처리량과 p50/p95/p99 지연 시간을 보고합니다.
+결과는 JSON으로 저장되어 커밋 간 비교에 사용할 수 있습니다.
+
+실행 예:
+    # 인프로세스 (ASGI transport, 네트워크/서버 불필요)
+    python loadtest.py --requests 2000 --concurrency 32
+
+    # 로컬 uvicorn 서버를 띄워서 측정
+    python loadtest.py --start-server --requests 2000 --concurrency 32
+
+    # 이미 실행 중인 서버 대상 + 이전 결과와 비교 (CSV 내보내기 요청은 --allow-writes 없이는 제외)
+    python loadtest.py --url http://127.0.0.1:8000 --compare loadtest_results/old.json
+
+인프로세스/--start-server 실행은 항상 임시 결과 DB를 사용하므로 실제 결과 저장소에 기록하지 않습니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 기본 요청 조합 (이름 → 가중치)
+DEFAULT_MIX = {
+    "get_csv": 40,
+    "get_csv_conditional": 15,
+    "post_csv": 20,
+    "csv_columns": 10,
+    "pediatric_score": 5,
+    "results": 5,
+    "results_aggregate": 5,
+}
+
+# 결과 저장소에 기록되는(쓰기) 요청 종류
+EXPORT_ROUTES = ("get_csv", "get_csv_conditional", "post_csv")
+
+# 조건부 GET 재사용을 위해 환자 ID 공간을 제한
+_PATIENT_POOL = 500
+
+
+def _organ_params(rng: random.Random, organ: str, volume: float) -> Dict[str, float]:
+    """장기 하나의 그럴듯한 특징 값을 생성합니다."""
+    mean_hu = rng.gauss(55 if organ == "liver" else 45, 8)
+    return {
+        f"{organ}_volume_ml": round(volume, 1),
+        f"{organ}_mean_hu": round(mean_hu, 2),
+        f"{organ}_std_hu": round(abs(rng.gauss(15, 4)), 2),
+        f"{organ}_min_hu": round(mean_hu - 80, 1),
+        f"{organ}_max_hu": round(mean_hu + 90, 1),
+        f"{organ}_p10_hu": round(mean_hu - 18, 2),
+        f"{organ}_p90_hu": round(mean_hu + 18, 2),
+        f"{organ}_glcm_contrast": round(abs(rng.gauss(120, 30)), 3),
+        f"{organ}_glcm_homogeneity": round(rng.uniform(0.05, 0.2), 4),
+        f"{organ}_glrlm_lre": round(rng.uniform(1.0, 2.0), 4),
+        f"{organ}_glszm_ze": round(rng.uniform(3.5, 4.5), 4),
+    }
+
+
+def _patient_params(rng: random.Random, patient_index: int) -> Dict[str, Any]:
+    """환자 한 명의 CSV 내보내기 파라미터를 생성합니다 (같은 인덱스면 같은 값)."""
+    patient_rng = random.Random(patient_index)
+    params: Dict[str, Any] = {
+        "patient_id": f"LT{patient_index:05d}",
+        "study_id": f"ST{patient_index:05d}",
+        "study_date": f"2025-{patient_index % 12 + 1:02d}-{patient_index % 28 + 1:02d}",
+    }
+    params.update(_organ_params(patient_rng, "liver", patient_rng.gauss(1400, 200)))
+    params.update(_organ_params(patient_rng, "spleen", patient_rng.gauss(180, 50)))
+    if patient_rng.random() < 0.3:
+        params.update({
+            "sex": patient_rng.choice(["M", "F"]),
+            "age_years": round(patient_rng.uniform(1, 17), 1),
+            "weight_kg": round(patient_rng.uniform(8, 70), 1),
+        })
+    return params
+
+
+class Scenario:
+    """
+    요청 조합 생성기.
+
+    조건부 GET은 앞서 받은 ETag를 If-None-Match로 다시 보내 304 경로를 측정합니다.
+    """
+
+    def __init__(self, mix: Dict[str, int], seed: int = 0, cohort_size: int = 1000):
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.rng = random.Random(seed)
+        self.cohort_size = cohort_size
+        self.etags: Dict[str, str] = {}
+        self.builders: Dict[str, Callable[[], Tuple[str, str, Dict[str, Any]]]] = {
+            "get_csv": self._get_csv,
+            "get_csv_conditional": self._get_csv_conditional,
+            "post_csv": self._post_csv,
+            "csv_columns": lambda: ("GET", "/api/abdomen/csv-columns", {}),
+            "pediatric_score": self._pediatric_score,
+            "results": self._results,
+            "results_aggregate": self._results_aggregate,
+        }
+        unknown = set(self.names) - set(self.builders)
+        if unknown:
+            raise ValueError(f"알 수 없는 요청 종류: {', '.join(sorted(unknown))}")
+
+    def next_request(self) -> Tuple[str, str, str, Dict[str, Any]]:
+        """(종류, HTTP 메서드, 경로, httpx 요청 옵션)을 반환합니다."""
+        name = self.rng.choices(self.names, weights=self.weights)[0]
+        method, path, options = self.builders[name]()
+        return name, method, path, options
+
+    def _get_csv(self) -> Tuple[str, str, Dict[str, Any]]:
+        params = _patient_params(self.rng, self.rng.randrange(_PATIENT_POOL))
+        return "GET", "/api/abdomen/liver-spleen/csv", {
+            "params": params,
+            "headers": {"Accept-Encoding": "gzip, br"},
+        }
+
+    def _get_csv_conditional(self) -> Tuple[str, str, Dict[str, Any]]:
+        method, path, options = self._get_csv()
+        etag = self.etags.get(options["params"]["patient_id"])
+        if etag:
+            options["headers"]["If-None-Match"] = etag
+        return method, path, options
+
+    def _post_csv(self) -> Tuple[str, str, Dict[str, Any]]:
+        params = _patient_params(self.rng, self.rng.randrange(_PATIENT_POOL))
+        return "POST", "/api/abdomen/liver-spleen/csv", {
+            "json": params,
+            "headers": {"Accept-Encoding": "gzip, br"},
+        }
+
+    def _pediatric_score(self) -> Tuple[str, str, Dict[str, Any]]:
+        n = self.cohort_size
+        rng = self.rng
+        return "POST", "/api/abdomen/pediatric-reference/score", {"json": {
+            "sex": [rng.choice("MF") for _ in range(n)],
+            "age_years": [round(rng.uniform(0, 18), 1) for _ in range(n)],
+            "weight_kg": [round(rng.uniform(3, 90), 1) for _ in range(n)],
+            "liver_volume_ml": [round(rng.gauss(1350, 200), 1) for _ in range(n)],
+            "spleen_volume_ml": [round(rng.gauss(175, 50), 1) for _ in range(n)],
+        }}
+
+    def _results(self) -> Tuple[str, str, Dict[str, Any]]:
+        return "GET", "/api/abdomen/results", {"params": {
+            "patient_id": f"LT{self.rng.randrange(_PATIENT_POOL):05d}",
+        }}
+
+    def _results_aggregate(self) -> Tuple[str, str, Dict[str, Any]]:
+        params = {"column": self.rng.choice(["volume_ml", "mean_HU", "GLCM_contrast"])}
+        if self.rng.random() < 0.5:
+            params["group_by"] = "study_month"
+        return "GET", "/api/abdomen/results/aggregate", {"params": params}
+
+    def observe(self, name: str, options: Dict[str, Any], response: httpx.Response) -> None:
+        """응답의 ETag를 기억하여 이후 조건부 요청에 사용합니다."""
+        if name.startswith("get_csv") and "etag" in response.headers:
+            self.etags[options["params"]["patient_id"]] = response.headers["etag"]
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    total_requests: int,
+    concurrency: int,
+) -> Tuple[Dict[str, List[float]], Dict[str, Dict[int, int]], float]:
+    """
+    지정한 동시성으로 요청을 보내고 경로별 지연 시간(초)과 상태 코드 수를 수집합니다.
+
+    Returns:
+        (종류별 지연 시간 리스트, 종류별 상태 코드 카운트, 전체 소요 시간)
+    """
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[str, Dict[int, int]] = {}
+    remaining = total_requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            name, method, path, options = scenario.next_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **options)
+                status = response.status_code
+                scenario.observe(name, options, response)
+            except httpx.HTTPError:
+                status = 0
+            elapsed = time.perf_counter() - start
+            latencies.setdefault(name, []).append(elapsed)
+            codes = statuses.setdefault(name, {})
+            codes[status] = codes.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def summarize(
+    latencies: Dict[str, List[float]],
+    statuses: Dict[str, Dict[int, int]],
+    duration: float,
+) -> Dict[str, Any]:
+    """경로별 처리량과 지연 시간 백분위수(ms)를 계산합니다."""
+    routes = {}
+    all_latencies = []
+    for name in sorted(latencies):
+        values = np.array(latencies[name]) * 1000.0
+        all_latencies.append(values)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        errors = sum(count for code, count in statuses[name].items() if code == 0 or code >= 500)
+        routes[name] = {
+            "count": int(len(values)),
+            "throughput_rps": len(values) / duration if duration > 0 else 0.0,
+            "mean_ms": float(values.mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(values.max()),
+            "errors": int(errors),
+            "status_codes": {str(k): v for k, v in sorted(statuses[name].items())},
+        }
+
+    combined = np.concatenate(all_latencies) if all_latencies else np.array([0.0])
+    p50, p95, p99 = np.percentile(combined, [50, 95, 99])
+    return {
+        "total": {
+            "count": int(combined.size),
+            "duration_s": duration,
+            "throughput_rps": combined.size / duration if duration > 0 else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "errors": sum(r["errors"] for r in routes.values()),
+        },
+        "routes": routes,
+    }
+
+
+def print_report(summary: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    """요약 결과를 표로 출력합니다 (baseline이 있으면 p95/처리량 변화율 포함)."""
+    header = f"{'route':<22}{'count':>7}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err':>5}"
+    if baseline:
+        header += f"{'Δrps':>9}{'Δp95':>9}"
+    print(header)
+    print("-" * len(header))
+
+    rows = list(summary["routes"].items()) + [("TOTAL", summary["total"])]
+    base_rows = dict(baseline["routes"], TOTAL=baseline["total"]) if baseline else {}
+    for name, r in rows:
+        line = (
+            f"{name:<22}{r['count']:>7}{r['throughput_rps']:>9.1f}"
+            f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r.get('errors', 0):>5}"
+        )
+        base = base_rows.get(name)
+        if base:
+            d_rps = (r["throughput_rps"] / base["throughput_rps"] - 1) * 100 if base["throughput_rps"] else 0.0
+            d_p95 = (r["p95_ms"] / base["p95_ms"] - 1) * 100 if base["p95_ms"] else 0.0
+            line += f"{d_rps:>+8.1f}%{d_p95:>+8.1f}%"
+        print(line)
+
+
+def _git_commit() -> Optional[str]:
+    """현재 git 커밋 해시 (git 저장소가 아니면 None)."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_mix(text: Optional[str]) -> Dict[str, int]:
+    """'get_csv=5,post_csv=3' 형식의 요청 조합을 파싱합니다."""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight) if weight else 1
+    return mix
+
+
+def _wait_for_server(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    """서버가 응답할 때까지 기다립니다."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn 서버가 시작 중에 종료되었습니다.")
+        try:
+            httpx.get(url + "/", timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("uvicorn 서버 시작 대기 시간 초과")
+
+
+def _isolated_env(workdir: str) -> Dict[str, str]:
+    """
+    측정 대상 앱(인프로세스/로컬 uvicorn)에 적용할 환경 변수.
+
+    CSV 내보내기는 결과 저장소에 기록되므로 항상 workdir 안의 새 임시 DB를 사용합니다
+    (AIVISQ_RESULTS_DB가 이미 설정되어 있어도 덮어씀).
+    참고치 표가 설정되지 않았으면 점수 계산 경로를 측정할 수 있도록 자리표시자 표를 사용합니다.
+
+    Args:
+        workdir: 실행이 끝나면 삭제되는 임시 디렉터리
+    """
+    from utils.pediatric_reference import PLACEHOLDER_REFERENCE_PATH, REFERENCE_PATH_ENV
+
+    return {
+        "AIVISQ_RESULTS_DB": os.path.join(workdir, "results.sqlite3"),
+        REFERENCE_PATH_ENV: os.environ.get(REFERENCE_PATH_ENV) or PLACEHOLDER_REFERENCE_PATH,
+    }
+
+
+async def _run(args: argparse.Namespace, mix: Dict[str, int], app_env: Dict[str, str]) -> Dict[str, Any]:
+    scenario = Scenario(mix, seed=args.seed, cohort_size=args.cohort_size)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+    else:
+        # 실제 결과 저장소를 건드리지 않도록 main import 전에 설정
+        os.environ.update(app_env)
+        from main import app
+
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout)
+
+    async with client:
+        if args.warmup:
+            await run_load(client, scenario, args.warmup, args.concurrency)
+        latencies, statuses, duration = await run_load(client, scenario, args.requests, args.concurrency)
+    return summarize(latencies, statuses, duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AIVISQ API 부하 테스트")
+    parser.add_argument("--url", help="대상 서버 URL (생략 시 인프로세스 ASGI transport)")
+    parser.add_argument("--start-server", action="store_true", help="로컬 uvicorn 서버를 띄워서 측정")
+    parser.add_argument("--port", type=int, default=8765, help="--start-server 사용 시 포트")
+    parser.add_argument("--requests", type=int, default=2000, help="측정 요청 수")
+    parser.add_argument("--warmup", type=int, default=100, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 수")
+    parser.add_argument("--mix", help="요청 조합 (예: get_csv=5,post_csv=3,csv_columns=1)")
+    parser.add_argument("--cohort-size", type=int, default=1000, help="소아 참고치 요청의 코호트 크기")
+    parser.add_argument("--timeout", type=float, default=30.0, help="요청 타임아웃 (초)")
+    parser.add_argument("--seed", type=int, default=0, help="요청 생성 시드")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: loadtest_results/<시각>_<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument(
+        "--allow-writes",
+        action="store_true",
+        help="--url 대상에도 CSV 내보내기(결과 저장소 기록) 요청을 보냄",
+    )
+    args = parser.parse_args()
+    if args.url and args.start_server:
+        parser.error("--url과 --start-server는 함께 사용할 수 없습니다.")
+
+    mix = _parse_mix(args.mix)
+    if args.url and not args.allow_writes:
+        # 외부 서버의 결과 저장소에 가짜 환자(LT0xxxx)가 기록되지 않도록 내보내기 요청 제외
+        writes = sorted(set(mix) & set(EXPORT_ROUTES))
+        if args.mix and writes:
+            parser.error(
+                f"--url 대상에 결과 저장소 기록 요청({', '.join(writes)})을 보내려면 --allow-writes가 필요합니다."
+            )
+        mix = {name: weight for name, weight in mix.items() if name not in EXPORT_ROUTES}
+        print(f"note: --url 대상이므로 CSV 내보내기 요청({', '.join(EXPORT_ROUTES)})을 제외합니다 (--allow-writes로 포함).")
+
+    # 임시 결과 DB는 측정(및 서버 종료)이 끝나면 디렉터리째 삭제
+    with tempfile.TemporaryDirectory(prefix="aivisq_loadtest_") as workdir:
+        app_env = _isolated_env(workdir)
+        server = None
+        if args.start_server:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+                cwd=BACKEND_DIR,
+                env={**os.environ, **app_env},
+            )
+            args.url = f"http://127.0.0.1:{args.port}"
+            _wait_for_server(args.url, server)
+
+        try:
+            summary = asyncio.run(_run(args, mix, app_env))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    commit = _git_commit()
+    result = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "target": args.url or "in-process",
+        "config": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "cohort_size": args.cohort_size,
+            "seed": args.seed,
+        },
+        **summary,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"baseline: {baseline.get('commit')} ({baseline.get('timestamp')})")
+    print(f"target: {result['target']}, commit: {commit}, concurrency: {args.concurrency}")
+    print_report(summary, baseline)
+
+    output = args.output or os.path.join(
+        BACKEND_DIR,
+        "loadtest_results",
+        f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'nogit'}.json",
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,41 @@
 
 FastAPI 기반 백엔드 서버
 """
-from fastapi import FastAPI, HTTPException, Query
+import logging
+import sqlite3
+from datetime import date
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 from typing import Optional
-from datetime import datetime
 
-from models.schemas import CSVExportRequest, CSV_COLUMNS
-from utils.csv_generator import generate_csv_bytes, create_csv_from_request
+import numpy as np
+
+from models.schemas import (
+    CSVExportRequest,
+    PediatricCohortRequest,
+    CSV_COLUMNS,
+    REFERENCE_CSV_COLUMNS,
+)
+from utils.csv_generator import build_organ_data, create_csv_from_request
+from utils.pediatric_reference import (
+    REFERENCE_PATH_ENV,
+    is_reference_configured,
+    reference_fingerprint,
+    score_cohort,
+)
+from utils.results_store import get_results_store, NUMERIC_COLUMNS
+from utils.http_cache import (
+    RenderedResponseCache,
+    compute_etag,
+    format_etag,
+    matched_encoding,
+    negotiate_encoding,
+)
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="AIVISQ Abdomen CT API",
@@ -29,8 +56,95 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Content-Disposition", "ETag"],
 )
 
+# 렌더링된 CSV 본문 캐시 (ETag 기준 LRU)
+csv_cache = RenderedResponseCache()
+
+# CSV 형식이 바뀌면 기존 ETag가 무효화되도록 컬럼 구성을 ETag에 포함
+_CSV_FORMAT_VERSION = ",".join(CSV_COLUMNS + REFERENCE_CSV_COLUMNS)
+
+
+def _save_export_results(params: dict) -> None:
+    """
+    내보낸 결과를 결과 저장소에 기록합니다.
+    
+    저장은 부가 기능이므로 DB 오류(잠금 시간 초과 등)가 나도 CSV 응답은 계속 진행합니다.
+    """
+    organ_values = {k: v for k, v in params.items() if k.startswith(("liver_", "spleen_"))}
+    liver_data, spleen_data = build_organ_data(**organ_values)
+    try:
+        get_results_store().upsert_features(
+            params["patient_id"],
+            params["study_id"],
+            {"liver": liver_data, "spleen": spleen_data},
+            params["study_date"],
+        )
+    except (sqlite3.Error, OSError):
+        logger.exception("분석 결과 저장 실패 (patient_id=%s)", params["patient_id"])
+
+
+def _csv_response(export_request: CSVExportRequest, http_request: Request, conditional: bool) -> Response:
+    """
+    CSV 내보내기 응답을 생성합니다.
+    
+    정규화한 입력으로 ETag를 계산하여 렌더링 결과를 LRU 캐시에서 재사용하고,
+    Accept-Encoding에 따라 gzip/brotli로 압축합니다.
+    conditional이 True이면 If-None-Match가 일치할 때 304를 반환합니다.
+    """
+    params = export_request.model_dump(mode="json")
+    # 참고치 표가 교체/설정되면 같은 입력이라도 응답이 달라지므로 표 내용 해시도 포함
+    etag = compute_etag(params, version=f"{_CSV_FORMAT_VERSION}\n{reference_fingerprint()}")
+    
+    # 캐시 적중/304 여부와 무관하게 모든 내보내기를 저장소에 기록
+    _save_export_results(params)
+    
+    accept_encoding = http_request.headers.get("accept-encoding")
+    
+    # 파일명 생성 (입력이 같으면 항상 같은 응답이 되도록 시각은 넣지 않음)
+    name_parts = [export_request.patient_id]
+    if export_request.study_id:
+        name_parts.append(export_request.study_id)
+    filename = f"liver_spleen_analysis_{'_'.join(name_parts)}.csv"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    
+    matched = matched_encoding(http_request.headers.get("if-none-match"), etag) if conditional else None
+    if matched is not None:
+        cached_size = csv_cache.size_hint(etag)
+        csv_cache.record_not_modified(cached_size)
+        if matched == "*":
+            matched = negotiate_encoding(accept_encoding, cached_size)
+        headers["ETag"] = format_etag(etag, matched)
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        csv_bytes = csv_cache.get(etag)
+        if csv_bytes is None:
+            csv_bytes = create_csv_from_request(
+                **{k: v for k, v in params.items() if k != "study_date"}
+            )
+            csv_cache.put(etag, csv_bytes)
+        encoding = negotiate_encoding(accept_encoding, len(csv_bytes))
+        content = csv_cache.encoded(etag, csv_bytes, encoding)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"CSV 생성 실패: {str(e)}")
+    
+    csv_cache.record_response(len(csv_bytes), len(content))
+    headers["ETag"] = format_etag(etag, encoding)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    
+    return Response(
+        content=content,
+        media_type="text/csv; charset=utf-8",
+        headers=headers,
+    )
+
 
 @app.get("/")
 async def root():
@@ -44,8 +158,14 @@ async def root():
 
 @app.get("/api/abdomen/liver-spleen/csv")
 async def get_liver_spleen_csv(
+    http_request: Request,
     patient_id: str = Query(..., description="환자 ID"),
     study_id: Optional[str] = Query(None, description="검사/스터디 ID"),
+    study_date: Optional[date] = Query(None, description="검사일 (YYYY-MM-DD)"),
+    # 소아 참고치 비교용
+    sex: Optional[str] = Query(None, description="성별 (M/F)"),
+    age_years: Optional[float] = Query(None, description="나이 (년)"),
+    weight_kg: Optional[float] = Query(None, description="체중 (kg)"),
     # 간 데이터
     liver_volume_ml: Optional[float] = Query(None, description="간 부피 (mL)"),
     liver_mean_hu: Optional[float] = Query(None, description="간 평균 HU"),
@@ -58,6 +178,12 @@ async def get_liver_spleen_csv(
     liver_glcm_homogeneity: Optional[float] = Query(None, description="간 GLCM homogeneity"),
     liver_glrlm_lre: Optional[float] = Query(None, description="간 GLRLM LRE"),
     liver_glszm_ze: Optional[float] = Query(None, description="간 GLSZM ZE"),
+    liver_surface_area_mm2: Optional[float] = Query(None, description="간 표면적 (mm²)"),
+    liver_sphericity: Optional[float] = Query(None, description="간 구형도"),
+    liver_max_diameter_mm: Optional[float] = Query(None, description="간 최대 3D 직경 (mm)"),
+    liver_major_axis_mm: Optional[float] = Query(None, description="간 주축 길이 (mm)"),
+    liver_minor_axis_mm: Optional[float] = Query(None, description="간 부축 길이 (mm)"),
+    liver_least_axis_mm: Optional[float] = Query(None, description="간 최소축 길이 (mm)"),
     # 비장 데이터
     spleen_volume_ml: Optional[float] = Query(None, description="비장 부피 (mL)"),
     spleen_mean_hu: Optional[float] = Query(None, description="비장 평균 HU"),
@@ -70,107 +196,75 @@ async def get_liver_spleen_csv(
     spleen_glcm_homogeneity: Optional[float] = Query(None, description="비장 GLCM homogeneity"),
     spleen_glrlm_lre: Optional[float] = Query(None, description="비장 GLRLM LRE"),
     spleen_glszm_ze: Optional[float] = Query(None, description="비장 GLSZM ZE"),
+    spleen_surface_area_mm2: Optional[float] = Query(None, description="비장 표면적 (mm²)"),
+    spleen_sphericity: Optional[float] = Query(None, description="비장 구형도"),
+    spleen_max_diameter_mm: Optional[float] = Query(None, description="비장 최대 3D 직경 (mm)"),
+    spleen_major_axis_mm: Optional[float] = Query(None, description="비장 주축 길이 (mm)"),
+    spleen_minor_axis_mm: Optional[float] = Query(None, description="비장 부축 길이 (mm)"),
+    spleen_least_axis_mm: Optional[float] = Query(None, description="비장 최소축 길이 (mm)"),
 ):
     """
     간/비장 분석 결과를 CSV 파일로 반환합니다.
     
     GET 요청으로 쿼리 파라미터를 통해 데이터를 받아 CSV를 생성합니다.
     브라우저에서 직접 다운로드할 수 있도록 파일 응답을 반환합니다.
+    응답은 입력 파라미터로부터 계산한 ETag를 가지며, If-None-Match가 일치하면 304를 반환합니다.
     """
-    try:
-        csv_bytes = create_csv_from_request(
-            patient_id=patient_id,
-            study_id=study_id,
-            liver_volume_ml=liver_volume_ml,
-            liver_mean_hu=liver_mean_hu,
-            liver_std_hu=liver_std_hu,
-            liver_min_hu=liver_min_hu,
-            liver_max_hu=liver_max_hu,
-            liver_p10_hu=liver_p10_hu,
-            liver_p90_hu=liver_p90_hu,
-            liver_glcm_contrast=liver_glcm_contrast,
-            liver_glcm_homogeneity=liver_glcm_homogeneity,
-            liver_glrlm_lre=liver_glrlm_lre,
-            liver_glszm_ze=liver_glszm_ze,
-            spleen_volume_ml=spleen_volume_ml,
-            spleen_mean_hu=spleen_mean_hu,
-            spleen_std_hu=spleen_std_hu,
-            spleen_min_hu=spleen_min_hu,
-            spleen_max_hu=spleen_max_hu,
-            spleen_p10_hu=spleen_p10_hu,
-            spleen_p90_hu=spleen_p90_hu,
-            spleen_glcm_contrast=spleen_glcm_contrast,
-            spleen_glcm_homogeneity=spleen_glcm_homogeneity,
-            spleen_glrlm_lre=spleen_glrlm_lre,
-            spleen_glszm_ze=spleen_glszm_ze,
-        )
-        
-        # 파일명 생성
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"liver_spleen_analysis_{patient_id}_{timestamp}.csv"
-        
-        return Response(
-            content=csv_bytes,
-            media_type="text/csv; charset=utf-8",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Content-Type": "text/csv; charset=utf-8",
-            }
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"CSV 생성 실패: {str(e)}")
+    export_request = CSVExportRequest(
+        patient_id=patient_id,
+        study_id=study_id,
+        study_date=study_date,
+        sex=sex,
+        age_years=age_years,
+        weight_kg=weight_kg,
+        liver_volume_ml=liver_volume_ml,
+        liver_mean_hu=liver_mean_hu,
+        liver_std_hu=liver_std_hu,
+        liver_min_hu=liver_min_hu,
+        liver_max_hu=liver_max_hu,
+        liver_p10_hu=liver_p10_hu,
+        liver_p90_hu=liver_p90_hu,
+        liver_glcm_contrast=liver_glcm_contrast,
+        liver_glcm_homogeneity=liver_glcm_homogeneity,
+        liver_glrlm_lre=liver_glrlm_lre,
+        liver_glszm_ze=liver_glszm_ze,
+        liver_surface_area_mm2=liver_surface_area_mm2,
+        liver_sphericity=liver_sphericity,
+        liver_max_diameter_mm=liver_max_diameter_mm,
+        liver_major_axis_mm=liver_major_axis_mm,
+        liver_minor_axis_mm=liver_minor_axis_mm,
+        liver_least_axis_mm=liver_least_axis_mm,
+        spleen_volume_ml=spleen_volume_ml,
+        spleen_mean_hu=spleen_mean_hu,
+        spleen_std_hu=spleen_std_hu,
+        spleen_min_hu=spleen_min_hu,
+        spleen_max_hu=spleen_max_hu,
+        spleen_p10_hu=spleen_p10_hu,
+        spleen_p90_hu=spleen_p90_hu,
+        spleen_glcm_contrast=spleen_glcm_contrast,
+        spleen_glcm_homogeneity=spleen_glcm_homogeneity,
+        spleen_glrlm_lre=spleen_glrlm_lre,
+        spleen_glszm_ze=spleen_glszm_ze,
+        spleen_surface_area_mm2=spleen_surface_area_mm2,
+        spleen_sphericity=spleen_sphericity,
+        spleen_max_diameter_mm=spleen_max_diameter_mm,
+        spleen_major_axis_mm=spleen_major_axis_mm,
+        spleen_minor_axis_mm=spleen_minor_axis_mm,
+        spleen_least_axis_mm=spleen_least_axis_mm,
+    )
+    return await run_in_threadpool(_csv_response, export_request, http_request, True)
 
 
 @app.post("/api/abdomen/liver-spleen/csv")
-async def post_liver_spleen_csv(request: CSVExportRequest):
+async def post_liver_spleen_csv(request: CSVExportRequest, http_request: Request):
     """
     간/비장 분석 결과를 CSV 파일로 반환합니다.
     
     POST 요청으로 JSON 바디를 통해 데이터를 받아 CSV를 생성합니다.
     더 많은 데이터나 복잡한 요청에 적합합니다.
+    GET과 같은 ETag/서버 캐시/압축을 사용하지만, 조건부 요청(304)은 처리하지 않습니다.
     """
-    try:
-        csv_bytes = create_csv_from_request(
-            patient_id=request.patient_id,
-            study_id=request.study_id,
-            liver_volume_ml=request.liver_volume_ml,
-            liver_mean_hu=request.liver_mean_hu,
-            liver_std_hu=request.liver_std_hu,
-            liver_min_hu=request.liver_min_hu,
-            liver_max_hu=request.liver_max_hu,
-            liver_p10_hu=request.liver_p10_hu,
-            liver_p90_hu=request.liver_p90_hu,
-            liver_glcm_contrast=request.liver_glcm_contrast,
-            liver_glcm_homogeneity=request.liver_glcm_homogeneity,
-            liver_glrlm_lre=request.liver_glrlm_lre,
-            liver_glszm_ze=request.liver_glszm_ze,
-            spleen_volume_ml=request.spleen_volume_ml,
-            spleen_mean_hu=request.spleen_mean_hu,
-            spleen_std_hu=request.spleen_std_hu,
-            spleen_min_hu=request.spleen_min_hu,
-            spleen_max_hu=request.spleen_max_hu,
-            spleen_p10_hu=request.spleen_p10_hu,
-            spleen_p90_hu=request.spleen_p90_hu,
-            spleen_glcm_contrast=request.spleen_glcm_contrast,
-            spleen_glcm_homogeneity=request.spleen_glcm_homogeneity,
-            spleen_glrlm_lre=request.spleen_glrlm_lre,
-            spleen_glszm_ze=request.spleen_glszm_ze,
-        )
-        
-        # 파일명 생성
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"liver_spleen_analysis_{request.patient_id}_{timestamp}.csv"
-        
-        return Response(
-            content=csv_bytes,
-            media_type="text/csv; charset=utf-8",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Content-Type": "text/csv; charset=utf-8",
-            }
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"CSV 생성 실패: {str(e)}")
+    return await run_in_threadpool(_csv_response, request, http_request, False)
 
 
 @app.get("/api/abdomen/csv-columns")
@@ -183,6 +277,128 @@ async def get_csv_columns():
     return {
         "columns": CSV_COLUMNS,
         "count": len(CSV_COLUMNS),
+        "optional_columns": REFERENCE_CSV_COLUMNS if is_reference_configured() else [],
+    }
+
+
+@app.get("/api/abdomen/csv-cache/stats")
+async def get_csv_cache_stats():
+    """
+    CSV 내보내기 캐시 통계를 반환합니다.
+    
+    캐시 적중률, 304 응답 수, 304/압축으로 절감한 바이트를 확인할 때 사용합니다.
+    """
+    return csv_cache.snapshot()
+
+
+@app.post("/api/abdomen/pediatric-reference/score")
+async def score_pediatric_reference(request: PediatricCohortRequest):
+    """
+    코호트 전체의 소아 참고치 비교 결과를 반환합니다.
+    
+    간/비장 부피와 간/비장 부피비(LSVR)의 z-score, 백분위 순위를
+    한 번의 벡터 연산으로 계산하며, 결과는 요청과 같은 순서의 배열로 반환합니다.
+    계산할 수 없는 값은 null입니다.
+    검증된 참고치 표(AIVISQ_PEDIATRIC_REFERENCE)가 설정되지 않았거나 읽을 수 없으면 503을 반환합니다.
+    """
+    if not is_reference_configured():
+        raise HTTPException(
+            status_code=503,
+            detail=f"검증된 소아 참고치 표가 설정되지 않았거나 읽을 수 없습니다 (환경 변수 {REFERENCE_PATH_ENV}).",
+        )
+    
+    n = len(request.sex)
+    lengths = {
+        len(request.age_years),
+        len(request.weight_kg),
+        len(request.liver_volume_ml),
+        len(request.spleen_volume_ml),
+    }
+    if request.patient_id is not None:
+        lengths.add(len(request.patient_id))
+    if lengths != {n}:
+        raise HTTPException(status_code=400, detail="모든 배열의 길이가 같아야 합니다.")
+    
+    try:
+        scores = score_cohort(
+            sex=request.sex,
+            age_years=request.age_years,
+            weight_kg=request.weight_kg,
+            liver_volume_ml=request.liver_volume_ml,
+            spleen_volume_ml=request.spleen_volume_ml,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"참고치 계산 실패: {str(e)}")
+    
+    response = {
+        name: np.where(np.isnan(values), None, values).tolist()
+        for name, values in scores.items()
+    }
+    response["patient_id"] = request.patient_id
+    response["count"] = n
+    return response
+
+
+
+@app.get("/api/abdomen/results")
+async def get_results(
+    patient_id: Optional[str] = Query(None, description="환자 ID"),
+    study_id: Optional[str] = Query(None, description="검사/스터디 ID"),
+    organ: Optional[str] = Query(None, description="장기 (liver/spleen)"),
+    study_date_from: Optional[date] = Query(None, description="검사일 시작 (YYYY-MM-DD)"),
+    study_date_to: Optional[date] = Query(None, description="검사일 끝 (YYYY-MM-DD)"),
+    limit: int = Query(1000, ge=1, le=100000, description="최대 행 수"),
+    offset: int = Query(0, ge=0, description="시작 위치"),
+):
+    """
+    저장된 분석 결과를 조건으로 조회합니다.
+    
+    CSV 내보내기 시 기록된 결과를 CSV_COLUMNS 형식의 행으로 반환합니다.
+    """
+    rows = await run_in_threadpool(
+        get_results_store().query,
+        patient_id=patient_id,
+        study_id=study_id,
+        organ=organ,
+        study_date_from=study_date_from.isoformat() if study_date_from else None,
+        study_date_to=study_date_to.isoformat() if study_date_to else None,
+        limit=limit,
+        offset=offset,
+    )
+    return {
+        "rows": rows,
+        "count": len(rows),
+    }
+
+
+@app.get("/api/abdomen/results/aggregate")
+async def aggregate_results(
+    column: str = Query(..., description=f"집계할 컬럼 ({', '.join(NUMERIC_COLUMNS)})"),
+    group_by: Optional[str] = Query(None, description="추가 그룹 기준 (patient_id/study_id/study_month/study_year)"),
+    organ: Optional[str] = Query(None, description="장기 (liver/spleen)"),
+    study_date_from: Optional[date] = Query(None, description="검사일 시작 (YYYY-MM-DD)"),
+    study_date_to: Optional[date] = Query(None, description="검사일 끝 (YYYY-MM-DD)"),
+):
+    """
+    저장된 분석 결과를 장기(및 선택 그룹)별로 집계합니다.
+    
+    그룹별 개수, 평균, 표준편차, 5/25/50/75/95 백분위수를 반환합니다.
+    """
+    try:
+        groups = await run_in_threadpool(
+            get_results_store().aggregate,
+            column=column,
+            group_by=group_by,
+            organ=organ,
+            study_date_from=study_date_from.isoformat() if study_date_from else None,
+            study_date_to=study_date_to.isoformat() if study_date_to else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "column": column,
+        "group_by": group_by,
+        "groups": groups,
     }
 
 
@@ -3,10 +3,13 @@ from .schemas import (
     OrganType,
     HUStatistics,
     RadiomicsFeatures,
+    ShapeFeatures,
     OrganFeatures,
     PatientData,
     CSVExportRequest,
+    PediatricCohortRequest,
     CSV_COLUMNS,
+    REFERENCE_CSV_COLUMNS,
     CSV_COLUMN_DESCRIPTIONS,
 )
 
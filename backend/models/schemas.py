@@ -2,6 +2,7 @@
 CSV 생성을 위한 Pydantic 스키마 정의
 """
 from pydantic import BaseModel, Field
+from datetime import date
 from typing import Optional, List
 from enum import Enum
 
@@ -30,12 +31,23 @@ class RadiomicsFeatures(BaseModel):
     glszm_ze: Optional[float] = Field(None, description="GLSZM Zone Entropy")
 
 
+class ShapeFeatures(BaseModel):
+    """형태 특징"""
+    surface_area_mm2: Optional[float] = Field(None, description="표면적 (mm²)")
+    sphericity: Optional[float] = Field(None, description="구형도")
+    max_diameter_mm: Optional[float] = Field(None, description="최대 3D 직경 (mm)")
+    major_axis_mm: Optional[float] = Field(None, description="주축 길이 (mm)")
+    minor_axis_mm: Optional[float] = Field(None, description="부축 길이 (mm)")
+    least_axis_mm: Optional[float] = Field(None, description="최소축 길이 (mm)")
+
+
 class OrganFeatures(BaseModel):
     """개별 장기 특징 데이터"""
     organ: OrganType
     volume_ml: Optional[float] = Field(None, description="부피 (mL)")
     hu_stats: Optional[HUStatistics] = None
     radiomics: Optional[RadiomicsFeatures] = None
+    shape: Optional[ShapeFeatures] = None
 
 
 class PatientData(BaseModel):
@@ -50,6 +62,12 @@ class CSVExportRequest(BaseModel):
     """CSV 내보내기 요청"""
     patient_id: str
     study_id: Optional[str] = None
+    study_date: Optional[date] = None  # YYYY-MM-DD (결과 저장소 집계용)
+    
+    # 소아 참고치 비교용 (모두 입력 시 참고치 컬럼 추가)
+    sex: Optional[str] = None
+    age_years: Optional[float] = None
+    weight_kg: Optional[float] = None
     
     # 간 데이터
     liver_volume_ml: Optional[float] = None
@@ -63,6 +81,12 @@ class CSVExportRequest(BaseModel):
     liver_glcm_homogeneity: Optional[float] = None
     liver_glrlm_lre: Optional[float] = None
     liver_glszm_ze: Optional[float] = None
+    liver_surface_area_mm2: Optional[float] = None
+    liver_sphericity: Optional[float] = None
+    liver_max_diameter_mm: Optional[float] = None
+    liver_major_axis_mm: Optional[float] = None
+    liver_minor_axis_mm: Optional[float] = None
+    liver_least_axis_mm: Optional[float] = None
     
     # 비장 데이터
     spleen_volume_ml: Optional[float] = None
@@ -76,6 +100,22 @@ class CSVExportRequest(BaseModel):
     spleen_glcm_homogeneity: Optional[float] = None
     spleen_glrlm_lre: Optional[float] = None
     spleen_glszm_ze: Optional[float] = None
+    spleen_surface_area_mm2: Optional[float] = None
+    spleen_sphericity: Optional[float] = None
+    spleen_max_diameter_mm: Optional[float] = None
+    spleen_major_axis_mm: Optional[float] = None
+    spleen_minor_axis_mm: Optional[float] = None
+    spleen_least_axis_mm: Optional[float] = None
+
+
+class PediatricCohortRequest(BaseModel):
+    """소아 참고치 코호트 비교 요청 (컬럼 단위 배열)"""
+    patient_id: Optional[List[str]] = Field(None, description="환자 ID 목록")
+    sex: List[str] = Field(..., description="성별 (M/F)")
+    age_years: List[float] = Field(..., description="나이 (년)")
+    weight_kg: List[float] = Field(..., description="체중 (kg)")
+    liver_volume_ml: List[Optional[float]] = Field(..., description="간 부피 (mL)")
+    spleen_volume_ml: List[Optional[float]] = Field(..., description="비장 부피 (mL)")
 
 
 # CSV 컬럼 정의 (확장 가능하도록 상수로 정리)
@@ -94,6 +134,21 @@ CSV_COLUMNS = [
     "GLCM_homogeneity",
     "GLRLM_LRE",
     "GLSZM_ZE",
+    "surface_area_mm2",
+    "sphericity",
+    "max_diameter_mm",
+    "major_axis_mm",
+    "minor_axis_mm",
+    "least_axis_mm",
+]
+
+# 소아 참고치 비교 컬럼 (성별/나이/체중이 주어진 경우에만 추가)
+REFERENCE_CSV_COLUMNS = [
+    "volume_z",
+    "volume_percentile",
+    "LSVR",
+    "LSVR_z",
+    "LSVR_percentile",
 ]
 
 # 컬럼 이름 매핑 (추후 한글 헤더 등 지원 가능)
@@ -112,5 +167,16 @@ CSV_COLUMN_DESCRIPTIONS = {
     "GLCM_homogeneity": "라디오믹스 GLCM homogeneity",
     "GLRLM_LRE": "라디오믹스 GLRLM Long Run Emphasis",
     "GLSZM_ZE": "라디오믹스 GLSZM Zone Entropy",
+    "surface_area_mm2": "형태 표면적 (mm²)",
+    "sphericity": "형태 구형도",
+    "max_diameter_mm": "형태 최대 3D 직경 (mm)",
+    "major_axis_mm": "형태 주축 길이 (mm)",
+    "minor_axis_mm": "형태 부축 길이 (mm)",
+    "least_axis_mm": "형태 최소축 길이 (mm)",
+    "volume_z": "참고치 대비 부피 z-score",
+    "volume_percentile": "참고치 대비 부피 백분위",
+    "LSVR": "간/비장 부피비",
+    "LSVR_z": "참고치 대비 LSVR z-score",
+    "LSVR_percentile": "참고치 대비 LSVR 백분위",
 }
 
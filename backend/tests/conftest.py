@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+# main.py와 동일하게 backend 디렉터리 기준 절대 import (utils.x, models.x)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def results_store(tmp_path):
+    from utils.results_store import ResultsStore
+
+    return ResultsStore(str(tmp_path / "results.sqlite3"))
+
+
+@pytest.fixture
+def client(monkeypatch, results_store):
+    """임시 결과 저장소와 빈 CSV 캐시를 사용하는 TestClient."""
+    from fastapi.testclient import TestClient
+
+    import main
+    from utils.http_cache import RenderedResponseCache
+
+    monkeypatch.delenv("AIVISQ_PEDIATRIC_REFERENCE", raising=False)
+    monkeypatch.setattr(main, "get_results_store", lambda: results_store)
+    monkeypatch.setattr(main, "csv_cache", RenderedResponseCache())
+    return TestClient(main.app)
@@ -0,0 +1,102 @@
+"""
+DICOM 시리즈 로더 테스트 (합성 시리즈 사용)
+"""
+import os
+
+import numpy as np
+import pydicom
+import pytest
+
+from utils.dicom_loader import _write_synthetic_series, load_dicom_series
+
+
+NUM_SLICES = 8
+SIZE = 16
+PIXEL_SPACING = (0.7, 0.8)
+SLICE_THICKNESS = 2.5
+
+
+@pytest.fixture
+def series_dir(tmp_path):
+    _write_synthetic_series(
+        str(tmp_path),
+        num_slices=NUM_SLICES,
+        size=SIZE,
+        pixel_spacing=PIXEL_SPACING,
+        slice_thickness=SLICE_THICKNESS,
+    )
+    return tmp_path
+
+
+def _files(directory):
+    return sorted(str(p) for p in directory.iterdir())
+
+
+def _rewrite(path, **tags):
+    ds = pydicom.dcmread(path)
+    for name, value in tags.items():
+        setattr(ds, name, value)
+    ds.save_as(path, enforce_file_format=True)
+
+
+def test_shuffled_series_is_sorted_by_position(series_dir):
+    volume, _ = load_dicom_series(str(series_dir))
+
+    assert volume.shape == (SIZE, SIZE, NUM_SLICES)
+    assert volume.dtype == np.int16
+    for path in _files(series_dir):
+        ds = pydicom.dcmread(path)
+        z = int(round(float(ds.ImagePositionPatient[2]) / SLICE_THICKNESS))
+        np.testing.assert_array_equal(volume[:, :, z], ds.pixel_array.T.astype(np.int32) - 1024)
+
+
+def test_voxel_spacing_is_xyz(series_dir):
+    _, spacing = load_dicom_series(str(series_dir))
+
+    # PixelSpacing은 (row, col) = (y, x)
+    assert spacing == pytest.approx((PIXEL_SPACING[1], PIXEL_SPACING[0], SLICE_THICKNESS))
+
+
+def test_rescale_slope_and_intercept(series_dir):
+    for path in _files(series_dir):
+        _rewrite(path, RescaleSlope=2, RescaleIntercept=-1000)
+
+    volume, _ = load_dicom_series(str(series_dir))
+
+    for path in _files(series_dir):
+        ds = pydicom.dcmread(path)
+        z = int(round(float(ds.ImagePositionPatient[2]) / SLICE_THICKNESS))
+        expected = np.clip(ds.pixel_array.T.astype(np.int32) * 2 - 1000, -32768, 32767)
+        np.testing.assert_array_equal(volume[:, :, z], expected)
+
+
+def test_out_of_range_values_are_clipped(series_dir):
+    path = _files(series_dir)[0]
+    ds = pydicom.dcmread(path)
+    pixels = ds.pixel_array.copy()
+    pixels[0, 0] = 40000
+    ds.PixelData = pixels.tobytes()
+    ds.RescaleIntercept = 0
+    ds.save_as(path, enforce_file_format=True)
+
+    volume, _ = load_dicom_series(str(series_dir))
+
+    z = int(round(float(ds.ImagePositionPatient[2]) / SLICE_THICKNESS))
+    assert volume[0, 0, z] == 32767
+
+
+def test_mixed_series_is_rejected(series_dir):
+    _rewrite(_files(series_dir)[0], SeriesInstanceUID=pydicom.uid.generate_uid())
+
+    with pytest.raises(ValueError, match="시리즈"):
+        load_dicom_series(str(series_dir))
+
+
+def test_missing_slice_is_rejected(series_dir):
+    for path in _files(series_dir):
+        z = float(pydicom.dcmread(path, stop_before_pixels=True).ImagePositionPatient[2])
+        if z == SLICE_THICKNESS * (NUM_SLICES // 2):
+            os.remove(path)
+
+    with pytest.raises(ValueError, match="간격"):
+        load_dicom_series(str(series_dir))
@@ -0,0 +1,69 @@
+"""
+형태 특징(최대 직경) 테스트: hull 후보 축소와 블록 단위 거리 계산이 메쉬 전체 결과와 같은지 확인
+"""
+import numpy as np
+import pytest
+from scipy import ndimage
+from scipy.spatial.distance import pdist
+from skimage.measure import marching_cubes
+
+from utils import feature_calculator
+from utils.feature_calculator import _hull_candidates, _max_diameter, compute_shape_features
+
+
+SPACING = np.array([0.7, 0.9, 2.5])
+
+
+def _mesh_diameter(mask, spacing):
+    """메쉬 꼭짓점 전체에 대한 최대 직경 (기준값)."""
+    verts, _, _, _ = marching_cubes(np.pad(mask, 1).astype(np.float32), level=0.5, spacing=tuple(spacing))
+    return float(pdist(verts).max())
+
+
+def _blob(seed):
+    rng = np.random.default_rng(seed)
+    field = ndimage.gaussian_filter(rng.standard_normal((24, 20, 12)), 2.0)
+    mask = field > 0.05
+    labels, _ = ndimage.label(mask)
+    return labels == np.argmax(np.bincount(labels.ravel())[1:]) + 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_max_diameter_matches_full_mesh(seed):
+    mask = _blob(seed)
+
+    assert _max_diameter(_hull_candidates(mask, SPACING)) == pytest.approx(_mesh_diameter(mask, SPACING))
+
+
+def test_candidates_skip_interior_surfaces():
+    mask = np.ones((20, 20, 20), dtype=bool)
+    mask[5:15, 5:15, 5:15] = False  # 내부 구멍
+
+    candidates = _hull_candidates(mask, np.ones(3))
+
+    assert len(candidates) < 100
+    assert _max_diameter(candidates) == pytest.approx(_mesh_diameter(mask, np.ones(3)))
+
+
+@pytest.mark.parametrize("shape", [(1, 1, 1), (6, 1, 1), (5, 4, 1)])
+def test_max_diameter_degenerate_masks(shape):
+    mask = np.ones(shape, dtype=bool)
+
+    assert _max_diameter(_hull_candidates(mask, SPACING)) == pytest.approx(_mesh_diameter(mask, SPACING))
+
+
+def test_blockwise_distance_matches_pdist(monkeypatch):
+    points = np.random.default_rng(0).standard_normal((500, 3))
+    monkeypatch.setattr(feature_calculator, "_DIAMETER_BLOCK_ELEMENTS", 1000)
+
+    assert _max_diameter(points) == pytest.approx(pdist(points).max())
+
+
+def test_shape_features_sphere():
+    x, y, z = np.ogrid[:40, :40, :40]
+    sphere = (x - 20) ** 2 + (y - 20) ** 2 + (z - 20) ** 2 <= 15 ** 2
+
+    features = compute_shape_features(sphere, (1.0, 1.0, 1.0))
+
+    assert features["max_diameter"] == pytest.approx(31.0, abs=1.0)
+    assert features["sphericity"] == pytest.approx(1.0, abs=0.1)
@@ -0,0 +1,168 @@
+"""
+CSV 내보내기 HTTP 캐시 테스트: ETag/304/인코딩 협상과 렌더링 캐시
+"""
+import gzip
+import os
+
+import pytest
+
+import main
+from utils import http_cache
+from utils.http_cache import (
+    COMPRESSION_MIN_BYTES,
+    RenderedResponseCache,
+    compute_etag,
+    matched_encoding,
+    negotiate_encoding,
+)
+
+
+CSV_URL = "/api/abdomen/liver-spleen/csv"
+# 압축 임계값을 넘도록 긴 환자 ID 사용
+LARGE_PARAMS = {"patient_id": "P" * 1200, "liver_volume_ml": 1500.0}
+PREFERRED = "br" if http_cache.brotli is not None else "gzip"
+
+
+def test_etag_ignores_none_and_key_order():
+    a = compute_etag({"patient_id": "P1", "liver_volume_ml": 1.0, "study_id": None}, version="v1")
+    b = compute_etag({"liver_volume_ml": 1.0, "patient_id": "P1"}, version="v1")
+
+    assert a == b
+    assert compute_etag({"patient_id": "P1"}, version="v2") != compute_etag({"patient_id": "P1"}, version="v1")
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ('"other"', None),
+    ('"abc"', "identity"),
+    ('"abc-gzip"', "gzip"),
+    ('W/"abc-br"', "br"),
+    ('"other", "abc-gzip"', "gzip"),
+    ("*", "*"),
+])
+def test_matched_encoding(header, expected):
+    assert matched_encoding(header, "abc") == expected
+
+
+@pytest.mark.parametrize("accept, size, expected", [
+    (None, 10_000, "identity"),
+    ("gzip", COMPRESSION_MIN_BYTES - 1, "identity"),
+    ("gzip", COMPRESSION_MIN_BYTES, "gzip"),
+    ("gzip;q=0", 10_000, "identity"),
+    ("gzip;q=bad", 10_000, "identity"),
+    ("*", 10_000, PREFERRED),
+    ("*;q=0, gzip", 10_000, "gzip"),
+    ("identity", 10_000, "identity"),
+])
+def test_negotiate_encoding(accept, size, expected):
+    assert negotiate_encoding(accept, size) == expected
+
+
+def test_cache_evicts_least_recently_used():
+    cache = RenderedResponseCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"  # a를 최근 사용으로
+
+    cache.put("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_cache_byte_limit_counts_encodings():
+    body = os.urandom(4000)  # 압축되지 않는 본문
+    cache = RenderedResponseCache(max_bytes=2 * len(body) + 100)
+    cache.put("old", body)
+    cache.put("new", body)
+
+    encoded = cache.encoded("new", body, "gzip")
+
+    assert gzip.decompress(encoded) == body
+    assert cache.get("old") is None  # 가장 오래된 항목부터 제거
+    assert cache.get("new") == body
+    assert cache.snapshot()["cached_bytes"] == len(body) + len(encoded)
+
+
+def test_get_returns_etag_and_304(client):
+    first = client.get(CSV_URL, params=LARGE_PARAMS, headers={"Accept-Encoding": "identity"})
+    etag = first.headers["etag"]
+
+    again = client.get(CSV_URL, params=LARGE_PARAMS, headers={"Accept-Encoding": "identity"})
+    assert again.headers["etag"] == etag
+    assert again.content == first.content
+
+    not_modified = client.get(CSV_URL, params=LARGE_PARAMS, headers={
+        "Accept-Encoding": "identity", "If-None-Match": etag,
+    })
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+    changed = client.get(CSV_URL, params={**LARGE_PARAMS, "liver_volume_ml": 1600.0}, headers={
+        "If-None-Match": etag,
+    })
+    assert changed.status_code == 200
+
+
+def test_compressed_response_has_encoding_specific_etag(client):
+    plain = client.get(CSV_URL, params=LARGE_PARAMS, headers={"Accept-Encoding": "identity"})
+    compressed = client.get(CSV_URL, params=LARGE_PARAMS, headers={"Accept-Encoding": PREFERRED})
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == PREFERRED
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert compressed.content == plain.content  # 클라이언트가 해제한 본문
+
+
+def test_304_echoes_matched_encoding_after_eviction(client, monkeypatch):
+    compressed = client.get(CSV_URL, params=LARGE_PARAMS, headers={"Accept-Encoding": "gzip"})
+    gzip_etag = compressed.headers["etag"]
+    assert gzip_etag.endswith('-gzip"')
+
+    # 캐시가 비어 크기를 알 수 없어도, 304의 ETag는 클라이언트가 보낸 표현을 따라야 함
+    monkeypatch.setattr(main, "csv_cache", RenderedResponseCache())
+    response = client.get(CSV_URL, params=LARGE_PARAMS, headers={
+        "Accept-Encoding": "gzip", "If-None-Match": gzip_etag,
+    })
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == gzip_etag
+
+
+def test_post_never_returns_304(client):
+    first = client.post(CSV_URL, json=LARGE_PARAMS)
+
+    response = client.post(CSV_URL, json=LARGE_PARAMS, headers={"If-None-Match": first.headers["etag"]})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == first.headers["etag"]
+
+
+@pytest.mark.parametrize("revalidate", [False, True])
+def test_cache_hit_and_304_still_persist_latest_export(client, results_store, revalidate):
+    params = {"patient_id": "P1", "study_id": "S1", "liver_volume_ml": 1000.0}
+    etag = client.get(CSV_URL, params=params).headers["etag"]
+    client.get(CSV_URL, params={**params, "liver_volume_ml": 2000.0})
+
+    # 첫 요청과 같은 입력 → 캐시 적중 또는 304이지만 저장소는 다시 1000으로 돌아가야 함
+    headers = {"If-None-Match": etag} if revalidate else {}
+    response = client.get(CSV_URL, params=params, headers=headers)
+
+    assert response.status_code == (304 if revalidate else 200)
+    assert main.csv_cache.snapshot()["hits" if not revalidate else "not_modified"] == 1
+    [row] = results_store.query(patient_id="P1")
+    assert row["volume_ml"] == 1000.0
+
+
+def test_cache_stats_endpoint(client):
+    client.get(CSV_URL, params=LARGE_PARAMS)
+    client.get(CSV_URL, params=LARGE_PARAMS)
+
+    stats = client.get("/api/abdomen/csv-cache/stats").json()
+
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
@@ -0,0 +1,34 @@
+"""
+부하 테스트 도구의 집계/환경 격리 테스트
+"""
+import os
+import sys
+
+import loadtest
+
+
+def test_summarize_zero_duration():
+    summary = loadtest.summarize({"get_csv": [0.01, 0.02]}, {"get_csv": {200: 2}}, duration=0.0)
+
+    assert summary["routes"]["get_csv"]["throughput_rps"] == 0.0
+    assert summary["total"]["throughput_rps"] == 0.0
+    assert summary["routes"]["get_csv"]["count"] == 2
+
+
+def test_summarize_counts_server_errors():
+    summary = loadtest.summarize(
+        {"post_csv": [0.01, 0.02, 0.03]}, {"post_csv": {200: 1, 500: 1, 0: 1}}, duration=1.5
+    )
+
+    assert summary["routes"]["post_csv"]["throughput_rps"] == 2.0
+    assert summary["total"]["errors"] == 2
+
+
+def test_isolated_env_uses_given_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("AIVISQ_RESULTS_DB", "/real/results.sqlite3")
+    path_before = list(sys.path)
+
+    env = loadtest._isolated_env(str(tmp_path))
+
+    assert os.path.dirname(env["AIVISQ_RESULTS_DB"]) == str(tmp_path)
+    assert sys.path == path_before
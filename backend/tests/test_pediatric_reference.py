@@ -0,0 +1,110 @@
+"""
+소아 참고치 설정/점수 계산 테스트
+"""
+import shutil
+
+import numpy as np
+import pytest
+
+from utils.pediatric_reference import (
+    PLACEHOLDER_REFERENCE_PATH,
+    REFERENCE_PATH_ENV,
+    is_reference_configured,
+    reference_fingerprint,
+    score_cohort,
+)
+
+
+CSV_URL = "/api/abdomen/liver-spleen/csv"
+SCORE_URL = "/api/abdomen/pediatric-reference/score"
+PATIENT = {"patient_id": "P1", "liver_volume_ml": 1000.0, "spleen_volume_ml": 100.0}
+DEMOGRAPHICS = {"sex": "M", "age_years": 5.0, "weight_kg": 20.0}
+COHORT = {
+    "sex": ["M", "F"],
+    "age_years": [5.0, 12.0],
+    "weight_kg": [20.0, 40.0],
+    "liver_volume_ml": [1000.0, 1300.0],
+    "spleen_volume_ml": [100.0, None],
+}
+
+
+@pytest.fixture
+def reference_csv(tmp_path, monkeypatch):
+    path = tmp_path / "reference.csv"
+    shutil.copy(PLACEHOLDER_REFERENCE_PATH, path)
+    monkeypatch.setenv(REFERENCE_PATH_ENV, str(path))
+    return path
+
+
+def _header(response):
+    return response.content.decode("utf-8-sig").splitlines()[0].split(",")
+
+
+def test_unset_reference_is_not_configured(monkeypatch):
+    monkeypatch.delenv(REFERENCE_PATH_ENV, raising=False)
+
+    assert not is_reference_configured()
+    assert reference_fingerprint() == "none"
+    with pytest.raises(RuntimeError):
+        score_cohort(**COHORT)
+
+
+@pytest.mark.parametrize("content", [None, "measure,sex\nlsvr,M\n", "measure,sex,age_years,weight_kg,p5,p25,p50,p75,p95\n"])
+def test_unreadable_reference_is_not_configured(tmp_path, monkeypatch, content):
+    path = tmp_path / "reference.csv"
+    if content is not None:
+        path.write_text(content, encoding="utf-8")
+    monkeypatch.setenv(REFERENCE_PATH_ENV, str(path))
+
+    assert not is_reference_configured()
+    assert reference_fingerprint() == "none"
+
+
+def test_unreadable_reference_does_not_break_exports(client, tmp_path, monkeypatch):
+    monkeypatch.setenv(REFERENCE_PATH_ENV, str(tmp_path / "missing.csv"))
+
+    plain = client.get(CSV_URL, params=PATIENT)
+    with_demographics = client.get(CSV_URL, params={**PATIENT, **DEMOGRAPHICS})
+
+    assert plain.status_code == 200
+    assert with_demographics.status_code == 200
+    assert "volume_z" not in _header(with_demographics)
+    assert client.post(SCORE_URL, json=COHORT).status_code == 503
+
+
+def test_configured_reference_adds_columns_and_scores(client, reference_csv):
+    response = client.get(CSV_URL, params={**PATIENT, **DEMOGRAPHICS})
+    scores = client.post(SCORE_URL, json=COHORT)
+
+    assert "volume_z" in _header(response)
+    assert scores.status_code == 200
+    body = scores.json()
+    assert body["count"] == 2
+    assert body["lsvr"][0] == pytest.approx(10.0)
+    assert body["lsvr"][1] is None
+
+
+def test_replaced_reference_changes_fingerprint_and_scores(reference_csv):
+    before = reference_fingerprint()
+    z_before = score_cohort(**COHORT)["liver_volume_ml_z"][0]
+
+    lines = reference_csv.read_text(encoding="utf-8").splitlines()
+    halved = [lines[0]] + [
+        ",".join(v if i < 4 else str(float(v) / 2) for i, v in enumerate(line.split(",")))
+        for line in lines[1:]
+    ]
+    reference_csv.write_text("\n".join(halved) + "\n", encoding="utf-8")
+
+    assert reference_fingerprint() != before
+    assert score_cohort(**COHORT)["liver_volume_ml_z"][0] > z_before
+
+
+def test_z_score_is_zero_at_reference_median(reference_csv):
+    scores = score_cohort(**COHORT)
+    median = scores["liver_volume_ml_p50"][0]
+
+    at_median = score_cohort(["M"], [5.0], [20.0], [median], [100.0])
+
+    assert at_median["liver_volume_ml_z"][0] == pytest.approx(0.0, abs=1e-9)
+    assert at_median["liver_volume_ml_percentile"][0] == pytest.approx(50.0)
+    assert np.isnan(score_cohort(["M"], [5.0], [20.0], [None], [100.0])["liver_volume_ml_z"][0])
@@ -0,0 +1,159 @@
+"""
+분석 결과 저장소(SQLite) 테스트: upsert/조회/집계 및 내보내기 연동
+"""
+import sqlite3
+
+import numpy as np
+import pytest
+
+import main
+
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _row(patient_id, study_id, organ, volume_ml, study_date=None, **extra):
+    return {
+        "patient_id": patient_id,
+        "study_id": study_id,
+        "organ": organ,
+        "volume_ml": volume_ml,
+        "study_date": study_date,
+        **extra,
+    }
+
+
+@pytest.fixture
+def populated(results_store):
+    """환자 40명 × 검사 1~3회 × 장기 2개, 일부 volume_ml은 NULL."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(40):
+        for j in range(1 + i % 3):
+            for organ in ("liver", "spleen"):
+                volume = None if (i + j) % 11 == 0 else float(rng.normal(1000, 200))
+                rows.append(_row(f"P{i:03d}", f"S{j}", organ, volume, f"2024-{1 + (i + j) % 4:02d}-15"))
+    results_store.upsert_rows(rows)
+    return rows
+
+
+def _expected(rows, key):
+    groups = {}
+    for row in rows:
+        if row["volume_ml"] is not None:
+            groups.setdefault(key(row), []).append(row["volume_ml"])
+    return groups
+
+
+def test_upsert_overwrites_same_key(results_store):
+    results_store.upsert_rows([_row("P1", "S1", "liver", 1000.0, "2024-01-01")])
+    results_store.upsert_rows([_row("P1", "S1", "liver", 2000.0, "2024-02-01")])
+
+    rows = results_store.query(patient_id="P1")
+
+    assert len(rows) == 1
+    assert rows[0]["volume_ml"] == 2000.0
+    assert rows[0]["study_date"] == "2024-02-01"
+
+
+def test_missing_study_id_is_stored_as_empty_string(results_store):
+    results_store.upsert_rows([_row("P1", None, "liver", 1000.0)])
+    results_store.upsert_rows([_row("P1", "", "liver", 1100.0)])
+
+    rows = results_store.query(patient_id="P1")
+
+    assert [(r["study_id"], r["volume_ml"]) for r in rows] == [("", 1100.0)]
+
+
+def test_query_filters_and_paging(results_store, populated):
+    liver = results_store.query(organ="liver", study_date_from="2024-02-01", study_date_to="2024-03-31")
+    expected = [
+        r for r in populated
+        if r["organ"] == "liver" and "2024-02-01" <= r["study_date"] <= "2024-03-31"
+    ]
+    assert len(liver) == len(expected)
+    assert all(r["organ"] == "liver" for r in liver)
+
+    everything = results_store.query(limit=100000)
+    page = results_store.query(limit=7, offset=5)
+    assert page == everything[5:12]
+
+
+@pytest.mark.parametrize("group_by, key", [
+    (None, lambda r: (r["organ"], None)),
+    ("patient_id", lambda r: (r["organ"], r["patient_id"])),
+    ("study_month", lambda r: (r["organ"], r["study_date"][:7])),
+])
+def test_aggregate_matches_numpy(results_store, populated, group_by, key):
+    result = results_store.aggregate("volume_ml", group_by=group_by, percentiles=PERCENTILES)
+    expected = _expected(populated, key)
+
+    assert [(g["organ"], g.get(group_by)) for g in result] == sorted(expected)
+    for group in result:
+        values = np.array(expected[(group["organ"], group.get(group_by))])
+        assert group["count"] == len(values)
+        assert group["mean"] == pytest.approx(values.mean())
+        assert group["std"] == pytest.approx(values.std(), abs=1e-9)
+        for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            assert group[f"p{p}"] == pytest.approx(v)
+
+
+def test_aggregate_single_value_group(results_store):
+    results_store.upsert_rows([_row("P1", "S1", "liver", 1234.0)])
+
+    [group] = results_store.aggregate("volume_ml")
+
+    assert group["count"] == 1
+    assert group["std"] == 0.0
+    assert group["p5"] == group["p95"] == 1234.0
+
+
+def test_aggregate_empty_and_invalid(results_store):
+    assert results_store.aggregate("volume_ml", group_by="patient_id") == []
+    with pytest.raises(ValueError):
+        results_store.aggregate("patient_id")
+    with pytest.raises(ValueError):
+        results_store.aggregate("volume_ml", group_by="organ; DROP TABLE organ_results")
+
+
+def test_export_persists_rows(client, results_store):
+    response = client.get("/api/abdomen/liver-spleen/csv", params={
+        "patient_id": "P1", "study_date": "2024-03-05", "liver_volume_ml": 1500.0,
+    })
+    assert response.status_code == 200
+
+    rows = client.get("/api/abdomen/results", params={"patient_id": "P1"}).json()["rows"]
+    assert [(r["organ"], r["volume_ml"], r["study_date"]) for r in rows] == [("liver", 1500.0, "2024-03-05")]
+
+    aggregate = client.get("/api/abdomen/results/aggregate", params={"column": "volume_ml"}).json()
+    assert aggregate["groups"][0]["count"] == 1
+
+
+def test_export_rejects_invalid_study_date(client, results_store):
+    response = client.get("/api/abdomen/liver-spleen/csv", params={
+        "patient_id": "P1", "study_date": "2024-13-45", "liver_volume_ml": 1500.0,
+    })
+
+    assert response.status_code == 422
+    assert results_store.query() == []
+
+
+def test_export_succeeds_when_store_fails(client, monkeypatch):
+    class BrokenStore:
+        def upsert_features(self, *args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(main, "get_results_store", lambda: BrokenStore())
+
+    response = client.get("/api/abdomen/liver-spleen/csv", params={
+        "patient_id": "P1", "liver_volume_ml": 1500.0,
+    })
+
+    assert response.status_code == 200
+    assert "P1" in response.text
+
+
+def test_aggregate_endpoint_rejects_unknown_column(client):
+    response = client.get("/api/abdomen/results/aggregate", params={"column": "nope"})
+
+    assert response.status_code == 400
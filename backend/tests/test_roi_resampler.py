@@ -0,0 +1,40 @@
+"""
+ROI 리샘플링 및 바운딩 박스 여유 테스트
+"""
+import numpy as np
+import pytest
+
+from utils.feature_calculator import compute_mask_bounding_box
+from utils.roi_resampler import resample_roi
+
+
+SHAPE = (100, 100, 40)
+
+
+@pytest.fixture
+def mask():
+    mask = np.zeros(SHAPE, dtype=np.uint8)
+    mask[40:60, 45:55, 18:22] = 1
+    return mask
+
+
+def test_bounding_box_scalar_padding(mask):
+    assert compute_mask_bounding_box(mask, padding=2) == (slice(38, 62), slice(43, 57), slice(16, 24))
+
+
+def test_bounding_box_per_axis_padding_clipped(mask):
+    assert compute_mask_bounding_box(mask, padding=(50, 0, 3)) == (slice(0, 100), slice(45, 55), slice(15, 25))
+
+
+def test_bounding_box_empty_mask():
+    assert compute_mask_bounding_box(np.zeros(SHAPE, dtype=bool), padding=(1, 1, 1)) is None
+
+
+def test_padding_is_converted_per_axis(mask):
+    ct = np.zeros(SHAPE, dtype=np.int16)
+
+    result = resample_roi(ct, mask, voxel_spacing=(0.7, 0.7, 5.0), target_spacing=(1.0, 1.0, 1.0), padding_mm=5.0)
+
+    # 5 mm 여유 → 면내 ceil(5/0.7)=8 복셀, z축 1 슬라이스
+    assert result["bounding_box"] == ((32, 68), (37, 63), (17, 23))
+    assert result["mask"].sum() > 0
@@ -5,8 +5,10 @@ CSV 파일 생성 유틸리티
 """
 import io
 import csv
-from typing import Dict, Any, Optional, List
-from ..models.schemas import CSV_COLUMNS
+import math
+from typing import Dict, Any, Optional, List, Tuple
+from models.schemas import CSV_COLUMNS, REFERENCE_CSV_COLUMNS
+from .pediatric_reference import is_reference_configured, score_cohort
 
 
 def generate_csv_content(
@@ -14,6 +16,7 @@ def generate_csv_content(
     study_id: Optional[str],
     liver_data: Dict[str, Any],
     spleen_data: Dict[str, Any],
+    reference_data: Optional[Dict[str, Dict[str, Any]]] = None,
 ) -> str:
     """
     간/비장 분석 결과를 CSV 문자열로 생성합니다.
@@ -23,6 +26,7 @@ def generate_csv_content(
         study_id: 검사/스터디 ID
         liver_data: 간 분석 데이터
         spleen_data: 비장 분석 데이터
+        reference_data: 장기별 소아 참고치 비교 결과 (주어지면 참고치 컬럼 추가)
     
     Returns:
         CSV 형식 문자열 (UTF-8 BOM 포함)
@@ -31,21 +35,44 @@ def generate_csv_content(
     writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
     
     # 헤더 작성
-    writer.writerow(CSV_COLUMNS)
+    if reference_data is not None:
+        writer.writerow(CSV_COLUMNS + REFERENCE_CSV_COLUMNS)
+    else:
+        writer.writerow(CSV_COLUMNS)
     
     # 간 데이터 행 작성
     if liver_data:
         liver_row = _create_row(patient_id, study_id, "liver", liver_data)
+        if reference_data is not None:
+            liver_row += _create_reference_cells(reference_data.get("liver", {}))
         writer.writerow(liver_row)
     
     # 비장 데이터 행 작성
     if spleen_data:
         spleen_row = _create_row(patient_id, study_id, "spleen", spleen_data)
+        if reference_data is not None:
+            spleen_row += _create_reference_cells(reference_data.get("spleen", {}))
         writer.writerow(spleen_row)
     
     return output.getvalue()
 
 
+def _format_value(value: Any) -> str:
+    """값을 CSV 형식으로 포맷합니다."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        return f"{value:.4f}"
+    return str(value)
+
+
+def _create_reference_cells(data: Dict[str, Any]) -> List[str]:
+    """단일 장기의 소아 참고치 컬럼 값을 생성합니다."""
+    return [_format_value(data.get(column)) for column in REFERENCE_CSV_COLUMNS]
+
+
 def _create_row(
     patient_id: str,
     study_id: Optional[str],
@@ -64,29 +91,27 @@ def _create_row(
     Returns:
         CSV 행 데이터 리스트
     """
-    def format_value(value: Any) -> str:
-        """값을 CSV 형식으로 포맷합니다."""
-        if value is None:
-            return ""
-        if isinstance(value, float):
-            return f"{value:.4f}"
-        return str(value)
-    
     return [
         patient_id,
         study_id or "",
         organ,
-        format_value(data.get("volume_ml")),
-        format_value(data.get("mean_HU")),
-        format_value(data.get("std_HU")),
-        format_value(data.get("min_HU")),
-        format_value(data.get("max_HU")),
-        format_value(data.get("p10_HU")),
-        format_value(data.get("p90_HU")),
-        format_value(data.get("GLCM_contrast")),
-        format_value(data.get("GLCM_homogeneity")),
-        format_value(data.get("GLRLM_LRE")),
-        format_value(data.get("GLSZM_ZE")),
+        _format_value(data.get("volume_ml")),
+        _format_value(data.get("mean_HU")),
+        _format_value(data.get("std_HU")),
+        _format_value(data.get("min_HU")),
+        _format_value(data.get("max_HU")),
+        _format_value(data.get("p10_HU")),
+        _format_value(data.get("p90_HU")),
+        _format_value(data.get("GLCM_contrast")),
+        _format_value(data.get("GLCM_homogeneity")),
+        _format_value(data.get("GLRLM_LRE")),
+        _format_value(data.get("GLSZM_ZE")),
+        _format_value(data.get("surface_area_mm2")),
+        _format_value(data.get("sphericity")),
+        _format_value(data.get("max_diameter_mm")),
+        _format_value(data.get("major_axis_mm")),
+        _format_value(data.get("minor_axis_mm")),
+        _format_value(data.get("least_axis_mm")),
     ]
 
 
@@ -95,6 +120,7 @@ def generate_csv_bytes(
     study_id: Optional[str],
     liver_data: Dict[str, Any],
     spleen_data: Dict[str, Any],
+    reference_data: Optional[Dict[str, Dict[str, Any]]] = None,
 ) -> bytes:
     """
     CSV 내용을 바이트로 생성합니다 (UTF-8 BOM 포함).
@@ -106,20 +132,54 @@ def generate_csv_bytes(
         study_id: 검사/스터디 ID
         liver_data: 간 분석 데이터
         spleen_data: 비장 분석 데이터
+        reference_data: 장기별 소아 참고치 비교 결과
     
     Returns:
         UTF-8 BOM이 포함된 CSV 바이트
     """
-    csv_content = generate_csv_content(patient_id, study_id, liver_data, spleen_data)
+    csv_content = generate_csv_content(patient_id, study_id, liver_data, spleen_data, reference_data)
     
     # UTF-8 BOM (0xEF, 0xBB, 0xBF) 추가
     bom = b'\xef\xbb\xbf'
     return bom + csv_content.encode('utf-8')
 
 
-def create_csv_from_request(
-    patient_id: str,
-    study_id: Optional[str] = None,
+def compute_reference_data(
+    sex: Optional[str],
+    age_years: Optional[float],
+    weight_kg: Optional[float],
+    liver_volume_ml: Optional[float],
+    spleen_volume_ml: Optional[float],
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    단일 환자의 소아 참고치 비교 결과를 CSV 컬럼 형식으로 계산합니다.
+    
+    Returns:
+        {"liver": {...}, "spleen": {...}}
+        (성별/나이/체중 중 하나라도 없거나 검증된 참고치 표가 설정되지 않았으면 None)
+    """
+    if sex is None or age_years is None or weight_kg is None:
+        return None
+    if not is_reference_configured():
+        return None
+    
+    scores = score_cohort([sex], [age_years], [weight_kg], [liver_volume_ml], [spleen_volume_ml])
+    lsvr = {
+        "LSVR": float(scores["lsvr"][0]),
+        "LSVR_z": float(scores["lsvr_z"][0]),
+        "LSVR_percentile": float(scores["lsvr_percentile"][0]),
+    }
+    return {
+        organ: {
+            "volume_z": float(scores[f"{organ}_volume_ml_z"][0]),
+            "volume_percentile": float(scores[f"{organ}_volume_ml_percentile"][0]),
+            **lsvr,
+        }
+        for organ in ("liver", "spleen")
+    }
+
+
+def build_organ_data(
     liver_volume_ml: Optional[float] = None,
     liver_mean_hu: Optional[float] = None,
     liver_std_hu: Optional[float] = None,
@@ -131,6 +191,12 @@ def create_csv_from_request(
     liver_glcm_homogeneity: Optional[float] = None,
     liver_glrlm_lre: Optional[float] = None,
     liver_glszm_ze: Optional[float] = None,
+    liver_surface_area_mm2: Optional[float] = None,
+    liver_sphericity: Optional[float] = None,
+    liver_max_diameter_mm: Optional[float] = None,
+    liver_major_axis_mm: Optional[float] = None,
+    liver_minor_axis_mm: Optional[float] = None,
+    liver_least_axis_mm: Optional[float] = None,
     spleen_volume_ml: Optional[float] = None,
     spleen_mean_hu: Optional[float] = None,
     spleen_std_hu: Optional[float] = None,
@@ -142,11 +208,18 @@ def create_csv_from_request(
     spleen_glcm_homogeneity: Optional[float] = None,
     spleen_glrlm_lre: Optional[float] = None,
     spleen_glszm_ze: Optional[float] = None,
-) -> bytes:
+    spleen_surface_area_mm2: Optional[float] = None,
+    spleen_sphericity: Optional[float] = None,
+    spleen_max_diameter_mm: Optional[float] = None,
+    spleen_major_axis_mm: Optional[float] = None,
+    spleen_minor_axis_mm: Optional[float] = None,
+    spleen_least_axis_mm: Optional[float] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
-    개별 파라미터로부터 CSV 바이트를 생성합니다.
+    요청 파라미터(liver_*/spleen_*)를 장기별 CSV 컬럼 딕셔너리로 변환합니다.
     
-    프론트엔드에서 전달된 데이터로 CSV를 생성할 때 사용합니다.
+    Returns:
+        (liver_data, spleen_data) (부피가 없는 장기는 빈 딕셔너리)
     """
     liver_data = {}
     if liver_volume_ml is not None:
@@ -162,6 +235,12 @@ def create_csv_from_request(
             "GLCM_homogeneity": liver_glcm_homogeneity,
             "GLRLM_LRE": liver_glrlm_lre,
             "GLSZM_ZE": liver_glszm_ze,
+            "surface_area_mm2": liver_surface_area_mm2,
+            "sphericity": liver_sphericity,
+            "max_diameter_mm": liver_max_diameter_mm,
+            "major_axis_mm": liver_major_axis_mm,
+            "minor_axis_mm": liver_minor_axis_mm,
+            "least_axis_mm": liver_least_axis_mm,
         }
     
     spleen_data = {}
@@ -178,7 +257,37 @@ def create_csv_from_request(
             "GLCM_homogeneity": spleen_glcm_homogeneity,
             "GLRLM_LRE": spleen_glrlm_lre,
             "GLSZM_ZE": spleen_glszm_ze,
+            "surface_area_mm2": spleen_surface_area_mm2,
+            "sphericity": spleen_sphericity,
+            "max_diameter_mm": spleen_max_diameter_mm,
+            "major_axis_mm": spleen_major_axis_mm,
+            "minor_axis_mm": spleen_minor_axis_mm,
+            "least_axis_mm": spleen_least_axis_mm,
         }
     
-    return generate_csv_bytes(patient_id, study_id, liver_data, spleen_data)
+    return liver_data, spleen_data
+
 
+def create_csv_from_request(
+    patient_id: str,
+    study_id: Optional[str] = None,
+    sex: Optional[str] = None,
+    age_years: Optional[float] = None,
+    weight_kg: Optional[float] = None,
+    **organ_values: Optional[float],
+) -> bytes:
+    """
+    개별 파라미터로부터 CSV 바이트를 생성합니다.
+    
+    프론트엔드에서 전달된 데이터로 CSV를 생성할 때 사용합니다.
+    
+    Args:
+        organ_values: build_organ_data의 liver_*/spleen_* 파라미터
+    """
+    liver_data, spleen_data = build_organ_data(**organ_values)
+    
+    reference_data = compute_reference_data(
+        sex, age_years, weight_kg, organ_values.get("liver_volume_ml"), organ_values.get("spleen_volume_ml")
+    )
+    
+    return generate_csv_bytes(patient_id, study_id, liver_data, spleen_data, reference_data)
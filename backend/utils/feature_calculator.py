@@ -4,9 +4,19 @@
 CT 이미지와 segmentation mask에서 HU 통계 및 라디오믹스 특징을 계산합니다.
 """
 import numpy as np
-from typing import Optional, Dict, Tuple, Any
+from typing import Optional, Dict, Tuple, Any, Sequence, Union
 from scipy import ndimage
+from scipy.spatial import ConvexHull, QhullError
+from scipy.spatial.distance import cdist
 from skimage.feature import graycomatrix, graycoprops
+from skimage.measure import marching_cubes, mesh_surface_area
+
+
+# 형태 특징 다운샘플링 후 허용하는 최대 축 간격 (mm)
+_SHAPE_MAX_SPACING_MM = 2.0
+
+# 최대 직경 계산 시 한 번에 만드는 거리 행렬 최대 원소 수 (float64 기준 약 32 MB)
+_DIAMETER_BLOCK_ELEMENTS = 4_000_000
 
 
 def compute_hu_statistics(
@@ -67,6 +77,40 @@ def compute_volume_ml(
     return float(volume_ml)
 
 
+def compute_mask_bounding_box(
+    mask: np.ndarray,
+    padding: Union[int, Sequence[int]] = 0
+) -> Optional[Tuple[slice, slice, slice]]:
+    """
+    마스크 영역을 감싸는 3D 바운딩 박스를 계산합니다.
+    
+    Args:
+        mask: segmentation mask
+        padding: 각 축 방향으로 추가할 여유 복셀 수 (정수 또는 축별 (x, y, z), 볼륨 경계에서 잘림)
+    
+    Returns:
+        볼륨 인덱싱에 사용할 slice 튜플 (마스크가 비어 있으면 None)
+    """
+    foreground = mask if mask.dtype == bool else mask > 0
+    
+    # z축으로 한 번 투영하여 (x, y) 범위를 구하고, z 범위는 잘라낸 영역에서만 탐색
+    projection_xy = np.any(foreground, axis=2)
+    x_indices = np.where(np.any(projection_xy, axis=1))[0]
+    if len(x_indices) == 0:
+        return None
+    y_indices = np.where(np.any(projection_xy, axis=0))[0]
+    column = foreground[x_indices[0]:x_indices[-1] + 1, y_indices[0]:y_indices[-1] + 1]
+    z_indices = np.where(np.any(column, axis=(0, 1)))[0]
+    
+    paddings = (padding,) * 3 if np.isscalar(padding) else tuple(padding)
+    bounds = []
+    for axis, (indices, pad) in enumerate(zip((x_indices, y_indices, z_indices), paddings)):
+        start = max(int(indices[0]) - int(pad), 0)
+        stop = min(int(indices[-1]) + 1 + int(pad), foreground.shape[axis])
+        bounds.append(slice(start, stop))
+    return tuple(bounds)
+
+
 def _normalize_for_glcm(image: np.ndarray, levels: int = 64) -> np.ndarray:
     """
     GLCM 계산을 위해 이미지를 정규화합니다.
@@ -284,13 +328,212 @@ def compute_glszm_features(
         return {"ze": None}
 
 
+def _coordinate_covariance(mask: np.ndarray, spacing: np.ndarray) -> np.ndarray:
+    """
+    마스크 복셀 좌표(mm)의 3x3 공분산 행렬을 계산합니다.
+    
+    좌표 배열을 만들지 않고 2D 투영(축별 합)에서 1차/2차 모멘트를 구합니다.
+    """
+    counts = mask.astype(np.float64)
+    n = counts.sum()
+    coords = [np.arange(size) * step for size, step in zip(mask.shape, spacing)]
+    # 각 좌표 평면으로의 투영: (x, y), (x, z), (y, z)
+    planes = {(0, 1): counts.sum(axis=2), (0, 2): counts.sum(axis=1), (1, 2): counts.sum(axis=0)}
+    
+    marginals = (planes[(0, 1)].sum(axis=1), planes[(0, 1)].sum(axis=0), planes[(0, 2)].sum(axis=0))
+    
+    means = np.array([c @ m for c, m in zip(coords, marginals)]) / n
+    second = np.diag([(c ** 2) @ m for c, m in zip(coords, marginals)]) / n
+    for (a, b), plane in planes.items():
+        second[a, b] = second[b, a] = coords[a] @ plane @ coords[b] / n
+    return second - np.outer(means, means)
+
+
+def _shape_downsample_steps(
+    spacing: np.ndarray,
+    downsample: int
+) -> Tuple[int, int, int]:
+    """
+    축별 다운샘플링 간격을 정합니다.
+    
+    다운샘플링 후 간격이 _SHAPE_MAX_SPACING_MM 이하인 축만 줄입니다
+    (예: 0.7×0.7×5 mm → 1.4×1.4×5 mm, 두꺼운 z 슬라이스는 유지).
+    """
+    return tuple(
+        downsample if step * downsample <= _SHAPE_MAX_SPACING_MM else 1
+        for step in spacing
+    )
+
+
+def _hull_candidates(mask: np.ndarray, spacing: np.ndarray) -> np.ndarray:
+    """
+    convex hull 꼭짓점이 될 수 있는 표면 점(mm)만 골라냅니다.
+
+    이진 마스크의 marching cubes 꼭짓점은 경계 복셀 면의 중심이므로,
+    각 축 방향 직선마다 처음/마지막 전경 복셀의 바깥 면 중심만 hull 꼭짓점 후보가 됩니다
+    (직선 위 나머지 점과 내부 구멍 표면은 두 점 사이에 있음).
+    후보 중 이웃 직선 두 후보의 중점보다 바깥으로 나오지 않은 점도 다른 점들의
+    볼록 결합이므로 제외합니다. 남은 점의 hull은 메쉬 전체의 hull과 같습니다.
+    """
+    points = []
+    for axis in range(3):
+        occupied = mask.any(axis=axis)
+        size = mask.shape[axis]
+        first = np.argmax(mask, axis=axis).astype(np.float64) - 0.5
+        last = size - 0.5 - np.argmax(np.flip(mask, axis=axis), axis=axis)
+        first[~occupied] = np.nan
+        last[~occupied] = np.nan
+        for extreme, sign in ((first, -1.0), (last, 1.0)):
+            keep = occupied.copy()
+            for other in (0, 1):
+                values = np.moveaxis(extreme, other, 0)
+                previous = np.full_like(values, np.nan)
+                following = np.full_like(values, np.nan)
+                previous[1:] = values[:-1]
+                following[:-1] = values[1:]
+                # 이웃 중점보다 바깥으로 나온 점만 유지 (이웃이 없으면 NaN 비교 → 유지)
+                inside = sign * (2.0 * values - previous - following) <= 0
+                keep &= ~np.moveaxis(inside, 0, other)
+            index = np.nonzero(keep)
+            coords = list(index)
+            coords.insert(axis, extreme[index])
+            points.append(np.stack(coords, axis=1))
+    return np.concatenate(points) * spacing
+
+
+def _max_diameter(points: np.ndarray) -> Optional[float]:
+    """
+    점 집합의 최대 3D 직경 (convex hull 꼭짓점 사이에서 탐색).
+
+    꼭짓점이 많아도 메모리가 일정하도록 거리 행렬을 블록 단위로 계산합니다.
+    """
+    try:
+        hull = ConvexHull(points)
+    except QhullError:
+        try:
+            # 평면 등 퇴화된 점 집합은 joggle 옵션으로 재시도
+            hull = ConvexHull(points, qhull_options="QJ")
+        except QhullError:
+            return None
+    vertices = points[hull.vertices]
+    block = max(_DIAMETER_BLOCK_ELEMENTS // len(vertices), 1)
+    max_distance = 0.0
+    for start in range(0, len(vertices), block):
+        # 대칭이므로 블록 이후의 점들과만 비교
+        distances = cdist(vertices[start:start + block], vertices[start:])
+        max_distance = max(max_distance, float(distances.max()))
+    return max_distance
+
+
+def compute_shape_features(
+    mask: np.ndarray,
+    voxel_spacing: Tuple[float, float, float] = (1.0, 1.0, 1.0),
+    downsample: int = 1
+) -> Dict[str, Optional[float]]:
+    """
+    마스크의 형태 특징을 계산합니다.
+    
+    마스크 바운딩 박스만 잘라 marching cubes로 표면 메쉬를 만들고,
+    최대 직경은 convex hull 꼭짓점 사이에서만 탐색합니다 (hull은 메쉬 전체 대신
+    축 방향 직선별 양 끝 경계 면 중심으로 만들며, 결과는 메쉬 hull과 같습니다).
+    표면/직경/주축은 각각 따로 계산하므로 한 단계가 실패해도 나머지 값은 반환됩니다.
+    
+    Args:
+        mask: segmentation mask
+        voxel_spacing: (x, y, z) 복셀 간격 (mm 단위)
+        downsample: 다운샘플링 배수 (1이면 원본 해상도).
+            결과 간격이 _SHAPE_MAX_SPACING_MM 이하가 되는 축에만 적용
+    
+    Returns:
+        형태 특징 딕셔너리 (surface_area, sphericity, max_diameter,
+        major_axis, minor_axis, least_axis; mm / mm² 단위, 계산 불가 시 None)
+    """
+    features = {
+        "surface_area": None,
+        "sphericity": None,
+        "max_diameter": None,
+        "major_axis": None,
+        "minor_axis": None,
+        "least_axis": None,
+    }
+    
+    bounding_box = compute_mask_bounding_box(mask)
+    if bounding_box is None:
+        return features
+    
+    roi_mask = mask[bounding_box]
+    spacing = np.asarray(voxel_spacing, dtype=np.float64)
+    if downsample > 1:
+        steps = _shape_downsample_steps(spacing, downsample)
+        roi_mask = roi_mask[::steps[0], ::steps[1], ::steps[2]]
+        spacing = spacing * np.array(steps)
+    roi_mask = roi_mask > 0
+    
+    # 주축 길이: 복셀 좌표 공분산의 고유값 (4·sqrt(λ))
+    eigenvalues = np.sort(np.linalg.eigvalsh(_coordinate_covariance(roi_mask, spacing)))[::-1]
+    axis_lengths = 4.0 * np.sqrt(np.maximum(eigenvalues, 0.0))
+    features["major_axis"] = float(axis_lengths[0])
+    features["minor_axis"] = float(axis_lengths[1])
+    features["least_axis"] = float(axis_lengths[2])
+    
+    # 닫힌 표면을 얻기 위해 경계에 0 패딩
+    padded = np.pad(roi_mask, 1).astype(np.float32)
+    try:
+        verts, faces, _, _ = marching_cubes(padded, level=0.5, spacing=tuple(spacing))
+    except (ValueError, RuntimeError):
+        return features
+    
+    surface_area = float(mesh_surface_area(verts, faces))
+    # 발산 정리로 메쉬 부피 계산
+    triangles = verts[faces]
+    mesh_volume = float(abs(np.sum(
+        np.einsum("ij,ij->i", triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2]))
+    )) / 6.0)
+    features["surface_area"] = surface_area
+    if surface_area > 0:
+        features["sphericity"] = float((36 * np.pi * mesh_volume ** 2) ** (1.0 / 3.0) / surface_area)
+    
+    features["max_diameter"] = _max_diameter(_hull_candidates(roi_mask, spacing))
+    return features
+
+
+def _texture_inputs(
+    ct_volume: np.ndarray,
+    mask: np.ndarray,
+    voxel_spacing: Tuple[float, float, float],
+    target_spacing: Optional[Tuple[float, float, float]],
+    patient_id: Optional[str],
+    study_id: Optional[str],
+    organ: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    텍스처 특징 계산에 사용할 (CT, 마스크)를 반환합니다.
+    
+    target_spacing이 주어지면 ROI만 잘라 리샘플링한 결과(캐시됨)를 사용합니다.
+    """
+    if target_spacing is None:
+        return ct_volume, mask
+    
+    from .roi_resampler import get_resampled_roi
+    
+    resampled = get_resampled_roi(
+        ct_volume, mask, voxel_spacing, target_spacing,
+        study_id=study_id, organ=organ, patient_id=patient_id,
+    )
+    if resampled is None:
+        return ct_volume, mask
+    return resampled["image"], resampled["mask"]
+
+
 def compute_liver_spleen_features(
     ct_volume: np.ndarray,
     liver_mask: np.ndarray,
     spleen_mask: np.ndarray,
     voxel_spacing: Tuple[float, float, float] = (1.0, 1.0, 1.0),
     patient_id: str = "",
-    study_id: Optional[str] = None
+    study_id: Optional[str] = None,
+    target_spacing: Optional[Tuple[float, float, float]] = None,
+    shape_downsample: int = 2
 ) -> Dict[str, Any]:
     """
     간과 비장의 모든 특징을 계산하는 통합 함수.
@@ -302,6 +545,9 @@ def compute_liver_spleen_features(
         voxel_spacing: 복셀 간격 (mm)
         patient_id: 환자 ID
         study_id: 검사/스터디 ID
+        target_spacing: 텍스처 특징용 리샘플링 목표 간격 (mm, None이면 원본 사용)
+        shape_downsample: 형태 특징 계산 시 마스크 다운샘플링 배수
+            (결과 간격이 2 mm 이하인 축에만 적용, 두꺼운 z 슬라이스는 유지)
     
     Returns:
         간/비장 특징 데이터 딕셔너리
@@ -316,9 +562,13 @@ def compute_liver_spleen_features(
     # 간 특징 계산
     if liver_mask is not None and np.any(liver_mask > 0):
         liver_hu = compute_hu_statistics(ct_volume, liver_mask)
-        liver_glcm = compute_glcm_features(ct_volume, liver_mask)
-        liver_glrlm = compute_glrlm_features(ct_volume, liver_mask)
-        liver_glszm = compute_glszm_features(ct_volume, liver_mask)
+        liver_ct, liver_texture_mask = _texture_inputs(
+            ct_volume, liver_mask, voxel_spacing, target_spacing, patient_id, study_id, "liver"
+        )
+        liver_glcm = compute_glcm_features(liver_ct, liver_texture_mask)
+        liver_glrlm = compute_glrlm_features(liver_ct, liver_texture_mask)
+        liver_glszm = compute_glszm_features(liver_ct, liver_texture_mask)
+        liver_shape = compute_shape_features(liver_mask, voxel_spacing, shape_downsample)
         
         results["liver"] = {
             "volume_ml": compute_volume_ml(liver_mask, voxel_spacing),
@@ -332,14 +582,24 @@ def compute_liver_spleen_features(
             "GLCM_homogeneity": liver_glcm["homogeneity"],
             "GLRLM_LRE": liver_glrlm["lre"],
             "GLSZM_ZE": liver_glszm["ze"],
+            "surface_area_mm2": liver_shape["surface_area"],
+            "sphericity": liver_shape["sphericity"],
+            "max_diameter_mm": liver_shape["max_diameter"],
+            "major_axis_mm": liver_shape["major_axis"],
+            "minor_axis_mm": liver_shape["minor_axis"],
+            "least_axis_mm": liver_shape["least_axis"],
         }
     
     # 비장 특징 계산
     if spleen_mask is not None and np.any(spleen_mask > 0):
         spleen_hu = compute_hu_statistics(ct_volume, spleen_mask)
-        spleen_glcm = compute_glcm_features(ct_volume, spleen_mask)
-        spleen_glrlm = compute_glrlm_features(ct_volume, spleen_mask)
-        spleen_glszm = compute_glszm_features(ct_volume, spleen_mask)
+        spleen_ct, spleen_texture_mask = _texture_inputs(
+            ct_volume, spleen_mask, voxel_spacing, target_spacing, patient_id, study_id, "spleen"
+        )
+        spleen_glcm = compute_glcm_features(spleen_ct, spleen_texture_mask)
+        spleen_glrlm = compute_glrlm_features(spleen_ct, spleen_texture_mask)
+        spleen_glszm = compute_glszm_features(spleen_ct, spleen_texture_mask)
+        spleen_shape = compute_shape_features(spleen_mask, voxel_spacing, shape_downsample)
         
         results["spleen"] = {
             "volume_ml": compute_volume_ml(spleen_mask, voxel_spacing),
@@ -353,6 +613,12 @@ def compute_liver_spleen_features(
             "GLCM_homogeneity": spleen_glcm["homogeneity"],
             "GLRLM_LRE": spleen_glrlm["lre"],
             "GLSZM_ZE": spleen_glszm["ze"],
+            "surface_area_mm2": spleen_shape["surface_area"],
+            "sphericity": spleen_shape["sphericity"],
+            "max_diameter_mm": spleen_shape["max_diameter"],
+            "major_axis_mm": spleen_shape["major_axis"],
+            "minor_axis_mm": spleen_shape["minor_axis"],
+            "least_axis_mm": spleen_shape["least_axis"],
         }
     
     return results
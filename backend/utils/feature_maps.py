@@ -0,0 +1,222 @@
+"""
+복셀 단위 특징 맵 계산 유틸리티
+
+장기 ROI 위에서 슬라이딩 윈도우 특징(국소 평균/표준편차 HU, 국소 GLCM contrast)을
+계산하여 뷰어 오버레이용 float32 맵으로 반환합니다.
+
+모든 윈도우 합은 적분 볼륨(3D 누적합)으로 구하므로 복셀당 O(1)이며,
+계산은 마스크 바운딩 박스 안에서만 수행됩니다.
+
+국소 GLCM contrast는 compute_glcm_features의 contrast와 수치를 비교할 수 없습니다.
+레벨 수(64)와 HU 클리핑 범위는 같지만, 여기서는 ROI 전체 마스크 내부의 최소/최대로 한 번
+양자화하고 두 복셀이 모두 마스크 안인 쌍만 셉니다. compute_glcm_features는 슬라이스마다
+마스크 외부를 0 HU로 채운 바운딩 박스를 정규화하고 배경과의 쌍도 포함합니다.
+맵은 장기 내부의 상대적인 분포를 보는 용도로만 사용하세요.
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import nibabel as nib
+
+from .feature_calculator import compute_mask_bounding_box
+
+
+# 양자화 레벨 및 HU 클리핑 범위 (compute_glcm_features와 같은 값, 정규화 방식은 다름 — 모듈 설명 참고)
+_GLCM_LEVELS = 64
+_HU_CLIP_RANGE = (-100, 300)
+
+# compute_glcm_features의 angles=[0, π/4, π/2, 3π/4], distance=1 에 대응하는 슬라이스 내 오프셋
+_GLCM_OFFSETS = ((0, 1, 0), (-1, 1, 0), (-1, 0, 0), (-1, -1, 0))
+
+
+def _box_sum(values: np.ndarray, radius: int) -> np.ndarray:
+    """
+    각 복셀 중심 (2r+1)³ 윈도우의 합을 계산합니다.
+
+    축마다 앞쪽에 0을 붙인 누적합(적분 볼륨)을 만들고 윈도우 양 끝의 차를 취하는
+    과정을 세 축에 차례로 적용하므로 윈도우 크기와 무관하게 복셀당 O(1)입니다.
+    윈도우가 볼륨 경계를 넘는 부분은 잘라냅니다.
+
+    Args:
+        values: 입력 볼륨
+        radius: 윈도우 반경 (복셀)
+
+    Returns:
+        원본 shape의 float64 윈도우 합
+    """
+    result = np.asarray(values, dtype=np.float64)
+    for axis, n in enumerate(result.shape):
+        index = np.arange(n)
+        low = np.clip(index - radius, 0, n)
+        high = np.clip(index + radius + 1, 0, n)
+
+        pad_shape = list(result.shape)
+        pad_shape[axis] += 1
+        integral = np.zeros(pad_shape, dtype=np.float64)
+        inner = [slice(None)] * result.ndim
+        inner[axis] = slice(1, None)
+        np.cumsum(result, axis=axis, out=integral[tuple(inner)])
+
+        result = np.take(integral, high, axis=axis)
+        result -= np.take(integral, low, axis=axis)
+    return result
+
+
+def _offset_slices(offset: int, n: int) -> Tuple[slice, slice]:
+    """축 방향 오프셋에 대한 (기준, 이웃) slice 쌍을 반환합니다."""
+    if offset >= 0:
+        return slice(0, n - offset), slice(offset, n)
+    return slice(-offset, n), slice(0, n + offset)
+
+
+def _quantize_roi(roi: np.ndarray, roi_mask: np.ndarray) -> Optional[np.ndarray]:
+    """
+    ROI 내부 HU 값을 GLCM 레벨로 양자화합니다 (마스크 외부는 0).
+
+    슬라이스별이 아니라 ROI 전체 마스크 내부 값의 최소/최대를 기준으로 합니다.
+
+    Args:
+        roi: 바운딩 박스로 자른 CT 볼륨
+        roi_mask: 바운딩 박스로 자른 boolean 마스크
+
+    Returns:
+        int32 양자화 볼륨 (값 범위가 없으면 None)
+    """
+    clipped = np.clip(roi, *_HU_CLIP_RANGE)
+    values = clipped[roi_mask]
+    values_min, values_max = values.min(), values.max()
+    if values_max - values_min <= 0:
+        return None
+    scale = (_GLCM_LEVELS - 1) / (values_max - values_min)
+    quantized = ((clipped - values_min) * scale).astype(np.int32)
+    quantized[~roi_mask] = 0
+    return quantized
+
+
+def _local_glcm_contrast(
+    quantized: np.ndarray,
+    roi_mask: np.ndarray,
+    radius: int
+) -> np.ndarray:
+    """
+    윈도우 내 GLCM contrast 맵을 계산합니다.
+
+    대칭 정규화 GLCM의 contrast는 윈도우 내 이웃 쌍의 (i - j)² 평균과 같으므로,
+    쌍별 제곱차와 쌍 개수를 각각 적분 볼륨으로 윈도우 합산하여 구합니다.
+    """
+    pair_sq = np.zeros(quantized.shape, dtype=np.float64)
+    pair_count = np.zeros(quantized.shape, dtype=np.float64)
+
+    for offset in _GLCM_OFFSETS:
+        src, dst = zip(*(_offset_slices(o, n) for o, n in zip(offset, quantized.shape)))
+        valid = roi_mask[src] & roi_mask[dst]
+        diff = quantized[src] - quantized[dst]
+        pair_sq[src] += np.where(valid, diff * diff, 0)
+        pair_count[src] += valid
+
+    sq_sum = _box_sum(pair_sq, radius)
+    count = _box_sum(pair_count, radius)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        contrast = np.where(count > 0, sq_sum / count, 0.0)
+    return contrast
+
+
+def compute_feature_maps(
+    ct_volume: np.ndarray,
+    mask: np.ndarray,
+    radius: int = 2
+) -> Dict[str, Any]:
+    """
+    마스크 바운딩 박스 내에서 복셀 단위 특징 맵을 계산합니다.
+
+    각 복셀의 값은 중심 (2r+1)³ 윈도우 중 마스크 내부 복셀만으로 계산하며,
+    마스크 외부 복셀은 0으로 설정합니다.
+
+    Args:
+        ct_volume: CT 이미지 볼륨 (HU 값)
+        mask: segmentation mask
+        radius: 윈도우 반경 (복셀)
+
+    Returns:
+        특징 맵 딕셔너리 (bounding_box, mean_HU, std_HU, GLCM_contrast)
+        마스크가 비어 있으면 빈 딕셔너리
+    """
+    bounding_box = compute_mask_bounding_box(mask)
+    if bounding_box is None:
+        return {}
+
+    roi = ct_volume[bounding_box].astype(np.float64)
+    roi_mask = mask[bounding_box] > 0
+
+    # 수치 안정성을 위해 ROI 평균을 빼고 누적
+    center = float(roi[roi_mask].mean())
+    centered = np.where(roi_mask, roi - center, 0.0)
+
+    count = _box_sum(roi_mask, radius)
+    sum1 = _box_sum(centered, radius)
+    sum2 = _box_sum(centered * centered, radius)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        local_mean = sum1 / count
+        local_var = np.maximum(sum2 / count - local_mean * local_mean, 0.0)
+
+    mean_map = np.where(roi_mask, local_mean + center, 0.0).astype(np.float32)
+    std_map = np.where(roi_mask, np.sqrt(local_var), 0.0).astype(np.float32)
+
+    quantized = _quantize_roi(roi, roi_mask)
+    if quantized is None:
+        contrast_map = np.zeros(roi.shape, dtype=np.float32)
+    else:
+        contrast = _local_glcm_contrast(quantized, roi_mask, radius)
+        contrast_map = np.where(roi_mask, contrast, 0.0).astype(np.float32)
+
+    return {
+        "bounding_box": tuple((s.start, s.stop) for s in bounding_box),
+        "mean_HU": mean_map,
+        "std_HU": std_map,
+        "GLCM_contrast": contrast_map,
+    }
+
+
+def feature_map_to_nifti(
+    feature_map: np.ndarray,
+    bounding_box: Tuple[Tuple[int, int], ...],
+    affine: np.ndarray
+) -> nib.Nifti1Image:
+    """
+    바운딩 박스 크기의 특징 맵을 원본 좌표계에 맞는 NIfTI 이미지로 변환합니다.
+
+    Args:
+        feature_map: compute_feature_maps의 맵 배열
+        bounding_box: compute_feature_maps의 bounding_box
+        affine: 원본 CT 볼륨의 affine
+
+    Returns:
+        float32 NIfTI 이미지 (affine 원점이 바운딩 박스 시작점으로 이동됨)
+    """
+    start = np.array([b[0] for b in bounding_box], dtype=np.float64)
+    cropped_affine = np.array(affine, dtype=np.float64)
+    cropped_affine[:3, 3] = cropped_affine[:3, :3] @ start + cropped_affine[:3, 3]
+    return nib.Nifti1Image(feature_map.astype(np.float32, copy=False), cropped_affine)
+
+
+if __name__ == "__main__":
+    from .feature_calculator import compute_liver_spleen_features
+
+    rng = np.random.default_rng(0)
+    shape = (512, 512, 120)
+    ct = rng.normal(60, 20, shape).astype(np.int16)
+    x, y, z = np.ogrid[:shape[0], :shape[1], :shape[2]]
+    liver = ((x - 200) / 120) ** 2 + ((y - 260) / 100) ** 2 + ((z - 60) / 50) ** 2 <= 1
+
+    start = time.perf_counter()
+    compute_liver_spleen_features(ct, liver, None)
+    global_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    maps = compute_feature_maps(ct, liver, radius=2)
+    map_elapsed = time.perf_counter() - start
+
+    print(f"global features: {global_elapsed:.2f}s")
+    print(f"feature maps:    {map_elapsed:.2f}s (bbox={maps['bounding_box']})")
@@ -0,0 +1,214 @@
+"""
+HTTP 캐시 유틸리티
+
+CSV 내보내기 응답은 요청 파라미터만으로 결정되므로, 정규화한 입력에서
+strong ETag를 계산하고 렌더링 결과를 서버 측 LRU에 보관합니다.
+큰 응답은 Accept-Encoding에 따라 gzip/brotli로 압축합니다.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # 선택적 의존성
+    brotli = None
+
+
+# 이 크기 미만의 응답은 압축하지 않음 (헤더 오버헤드 대비 이득이 작음)
+COMPRESSION_MIN_BYTES = 1024
+
+_ENCODING_SUFFIX = {"identity": "", "gzip": "-gzip", "br": "-br"}
+
+
+def compute_etag(params: Dict[str, Any], version: str = "") -> str:
+    """
+    정규화한 입력 파라미터로부터 strong ETag 값을 계산합니다.
+
+    None 값은 생략된 파라미터와 같게 취급합니다.
+
+    Args:
+        params: 응답을 결정하는 입력 파라미터
+        version: 출력 형식 버전 (컬럼 구성이 바뀌면 ETag도 바뀌도록)
+
+    Returns:
+        따옴표를 제외한 ETag 값
+    """
+    canonical = json.dumps(
+        {k: v for k, v in params.items() if v is not None},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    digest = hashlib.sha256(f"{version}\n{canonical}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def format_etag(etag: str, encoding: str = "identity") -> str:
+    """인코딩별로 구분되는 strong ETag 헤더 값을 만듭니다."""
+    return f'"{etag}{_ENCODING_SUFFIX[encoding]}"'
+
+
+def matched_encoding(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    If-None-Match 헤더에서 해당 리소스의 ETag와 일치하는 태그를 찾아 그 인코딩을 반환합니다.
+
+    304 응답의 ETag는 클라이언트가 가진 표현(인코딩)과 같아야 하므로,
+    캐시 상태가 아니라 일치한 태그에서 인코딩을 정합니다.
+
+    Returns:
+        일치한 태그의 인코딩 ("identity"/"gzip"/"br"), "*"이면 "*", 일치하지 않으면 None
+    """
+    if not if_none_match:
+        return None
+    candidates = {format_etag(etag, encoding): encoding for encoding in _ENCODING_SUFFIX}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return "*"
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in candidates:
+            return candidates[tag]
+    return None
+
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> str:
+    """
+    Accept-Encoding과 응답 크기로 사용할 인코딩을 고릅니다 (br > gzip > identity).
+    """
+    if not accept_encoding or size < COMPRESSION_MIN_BYTES:
+        return "identity"
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    def allowed(name: str) -> bool:
+        return accepted.get(name, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return "identity"
+
+
+def _encode(body: bytes, encoding: str) -> bytes:
+    """본문을 지정한 인코딩으로 압축합니다."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return body
+
+
+class RenderedResponseCache:
+    """
+    ETag → 렌더링된 본문(인코딩별) LRU 캐시와 적중/절감 통계.
+
+    Args:
+        max_entries: 보관할 최대 항목 수
+        max_bytes: 보관할 최대 총 바이트 (모든 인코딩 합계)
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "hits": 0,
+            "misses": 0,
+            "not_modified": 0,
+            "bytes_sent": 0,
+            "bytes_saved_not_modified": 0,
+            "bytes_saved_compression": 0,
+        }
+
+    def get(self, etag: str) -> Optional[bytes]:
+        """캐시된 원본 본문을 반환합니다 (적중/실패 통계 기록)."""
+        with self._lock:
+            self.stats["requests"] += 1
+            entry = self._entries.get(etag)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.stats["hits"] += 1
+            return entry["identity"]
+
+    def put(self, etag: str, body: bytes) -> None:
+        """원본 본문을 저장하고 용량을 넘으면 오래된 항목부터 제거합니다."""
+        with self._lock:
+            if etag in self._entries:
+                return
+            self._entries[etag] = {"identity": body}
+            self._size += len(body)
+            self._evict()
+
+    def encoded(self, etag: str, body: bytes, encoding: str) -> bytes:
+        """인코딩된 본문을 반환합니다 (캐시에 없으면 압축 후 보관)."""
+        if encoding == "identity":
+            return body
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None and encoding in entry:
+                return entry[encoding]
+
+        encoded = _encode(body, encoding)
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None and encoding not in entry:
+                entry[encoding] = encoded
+                self._size += len(encoded)
+                self._evict()
+        return encoded
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._size -= sum(len(v) for v in entry.values())
+
+    def record_response(self, body_size: int, sent_size: int) -> None:
+        """전송한 응답 크기와 압축으로 절감한 바이트를 기록합니다."""
+        with self._lock:
+            self.stats["bytes_sent"] += sent_size
+            self.stats["bytes_saved_compression"] += body_size - sent_size
+
+    def record_not_modified(self, body_size: int) -> None:
+        """304 응답으로 절감한 바이트를 기록합니다."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["not_modified"] += 1
+            self.stats["bytes_saved_not_modified"] += body_size
+
+    def size_hint(self, etag: str) -> int:
+        """캐시된 원본 본문 크기 (없으면 0)."""
+        with self._lock:
+            entry = self._entries.get(etag)
+            return len(entry["identity"]) if entry is not None else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """통계와 현재 캐시 상태를 반환합니다."""
+        with self._lock:
+            stats = dict(self.stats)
+            served = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / served if served else 0.0
+            stats["entries"] = len(self._entries)
+            stats["cached_bytes"] = self._size
+            stats["brotli_available"] = brotli is not None
+            return stats
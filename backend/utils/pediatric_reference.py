@@ -0,0 +1,297 @@
+"""
+소아 참고치 비교 유틸리티
+
+성별/나이/체중별 참고 백분위수(5/25/50/75/95) 표를 한 번만 읽어 격자 배열로 만들고,
+코호트 전체의 간/비장 부피와 간/비장 부피비(LSVR)에 대한 z-score 및 백분위 순위를
+한 번의 벡터 연산으로 계산합니다.
+
+참고치 표 (CSV, long format):
+    measure,sex,age_years,weight_kg,p5,p25,p50,p75,p95
+    measure: liver_volume_ml | spleen_volume_ml | lsvr
+    각 (measure, sex)는 age_years × weight_kg 격자를 빠짐없이 채워야 합니다.
+
+검증된 참고치 표는 환경 변수 AIVISQ_PEDIATRIC_REFERENCE로 지정해야 사용됩니다.
+저장소에 포함된 data/pediatric_reference.placeholder.csv는 개발/벤치마크용 자리표시자이며
+임상 값이 아니므로 기본값으로 사용하지 않습니다.
+"""
+import csv
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.special import ndtr
+
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_PATH_ENV = "AIVISQ_PEDIATRIC_REFERENCE"
+
+# 개발/벤치마크용 자리표시자 표 (검증된 참고치가 아님)
+PLACEHOLDER_REFERENCE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "pediatric_reference.placeholder.csv",
+)
+
+REFERENCE_MEASURES = ("liver_volume_ml", "spleen_volume_ml", "lsvr")
+REFERENCE_SEXES = ("M", "F")
+
+# 5/25/50/75/95 백분위수에 대응하는 표준정규 z 값
+_PERCENTILE_COLUMNS = ("p5", "p25", "p50", "p75", "p95")
+_PERCENTILE_Z = np.array([-1.6448536, -0.6744898, 0.0, 0.6744898, 1.6448536])
+
+
+class PediatricReference:
+    """
+    (measure, sex)별 나이 × 체중 격자 위의 참고 백분위수 표.
+
+    Args:
+        tables: {(measure, sex): (ages, weights, percentiles[A, W, 5])}
+    """
+
+    def __init__(self, tables: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]]):
+        self.tables = tables
+
+    @classmethod
+    def from_csv(cls, path: str) -> "PediatricReference":
+        """
+        long format CSV에서 참고치 표를 읽습니다.
+
+        Raises:
+            ValueError: 격자가 비어 있거나 누락된 칸이 있는 경우
+        """
+        rows: Dict[Tuple[str, str], Dict[Tuple[float, float], Sequence[float]]] = {}
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                key = (row["measure"].strip(), row["sex"].strip().upper())
+                point = (float(row["age_years"]), float(row["weight_kg"]))
+                rows.setdefault(key, {})[point] = [float(row[c]) for c in _PERCENTILE_COLUMNS]
+
+        tables = {}
+        for key, points in rows.items():
+            ages = np.array(sorted({a for a, _ in points}))
+            weights = np.array(sorted({w for _, w in points}))
+            grid = np.empty((len(ages), len(weights), len(_PERCENTILE_COLUMNS)))
+            for i, age in enumerate(ages):
+                for j, weight in enumerate(weights):
+                    if (age, weight) not in points:
+                        raise ValueError(f"참고치 격자 누락: {key} age={age} weight={weight}")
+                    grid[i, j] = points[(age, weight)]
+            tables[key] = (ages, weights, grid)
+
+        if not tables:
+            raise ValueError(f"참고치 표가 비어 있습니다: {path}")
+        return cls(tables)
+
+    def percentiles(
+        self,
+        measure: str,
+        sex: np.ndarray,
+        age_years: np.ndarray,
+        weight_kg: np.ndarray,
+    ) -> np.ndarray:
+        """
+        환자별 참고 백분위수(5/25/50/75/95)를 나이/체중 쌍선형 보간으로 구합니다.
+
+        격자 범위 밖의 나이/체중은 경계값으로 고정합니다.
+
+        Returns:
+            (N, 5) 배열 (해당 성별 표가 없으면 NaN)
+        """
+        result = np.full((len(sex), len(_PERCENTILE_COLUMNS)), np.nan)
+        for s in REFERENCE_SEXES:
+            table = self.tables.get((measure, s))
+            rows = np.flatnonzero(sex == s)
+            if table is None or len(rows) == 0:
+                continue
+            ages, weights, grid = table
+            ia, ta = _grid_position(ages, age_years[rows])
+            iw, tw = _grid_position(weights, weight_kg[rows])
+            ta = ta[:, None]
+            tw = tw[:, None]
+            result[rows] = (
+                grid[ia, iw] * (1 - ta) * (1 - tw)
+                + grid[ia + 1, iw] * ta * (1 - tw)
+                + grid[ia, iw + 1] * (1 - ta) * tw
+                + grid[ia + 1, iw + 1] * ta * tw
+            )
+        return result
+
+
+def _grid_position(axis: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    격자 축에서 각 값의 (하한 인덱스, 보간 비율)을 구합니다.
+
+    축 길이가 1이면 두 인덱스가 같은 칸을 가리키도록 격자를 복제한 것처럼 처리합니다.
+    """
+    if len(axis) == 1:
+        return np.zeros(len(values), dtype=np.intp), np.zeros(len(values))
+    clipped = np.clip(values, axis[0], axis[-1])
+    index = np.clip(np.searchsorted(axis, clipped, side="right") - 1, 0, len(axis) - 2)
+    fraction = (clipped - axis[index]) / (axis[index + 1] - axis[index])
+    return index, fraction
+
+
+def _z_scores(values: np.ndarray, knots: np.ndarray) -> np.ndarray:
+    """
+    백분위수 지점 사이를 z 공간에서 구간 선형 보간하여 z-score를 계산합니다.
+
+    양 끝 구간 밖의 값은 가장 가까운 구간의 기울기로 외삽합니다.
+    """
+    segment = np.clip(np.sum(values[:, None] > knots, axis=1), 1, len(_PERCENTILE_Z) - 1)
+    rows = np.arange(len(values))
+    low, high = knots[rows, segment - 1], knots[rows, segment]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (values - low) / (high - low)
+    return _PERCENTILE_Z[segment - 1] + t * (_PERCENTILE_Z[segment] - _PERCENTILE_Z[segment - 1])
+
+
+def configured_reference_path() -> Optional[str]:
+    """환경 변수로 지정된 검증된 참고치 표 경로 (미설정 시 None)."""
+    return os.environ.get(REFERENCE_PATH_ENV) or None
+
+
+@lru_cache(maxsize=4)
+def _load_reference(path: str, mtime_ns: int, size: int) -> Tuple[PediatricReference, str]:
+    """참고치 표와 파일 내용 해시 ((mtime, size)를 키에 포함하여 표가 교체되면 다시 읽음)."""
+    reference = PediatricReference.from_csv(path)
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return reference, digest
+
+
+@lru_cache(maxsize=4)
+def _try_load_reference(path: str, mtime_ns: int, size: int) -> Optional[Tuple[PediatricReference, str]]:
+    """_load_reference와 같지만 읽을 수 없는 표는 경고 후 None (실패도 캐시되어 한 번만 기록)."""
+    try:
+        return _load_reference(path, mtime_ns, size)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("소아 참고치 표를 읽을 수 없어 비활성화합니다 (%s): %r", path, e)
+        return None
+
+
+@lru_cache(maxsize=4)
+def _warn_missing_reference(path: str) -> None:
+    logger.warning("소아 참고치 표를 찾을 수 없어 비활성화합니다: %s", path)
+
+
+def _configured_reference() -> Optional[Tuple[PediatricReference, str]]:
+    """
+    설정된 참고치 표 (표, 내용 해시).
+
+    환경 변수가 없거나 파일을 읽을/검증할 수 없으면 None으로, 미설정과 같게 취급합니다.
+    """
+    path = configured_reference_path()
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _warn_missing_reference(path)
+        return None
+    return _try_load_reference(path, stat.st_mtime_ns, stat.st_size)
+
+
+def is_reference_configured() -> bool:
+    """검증된 참고치 표가 설정되어 있고 읽을 수 있는지 확인합니다."""
+    return _configured_reference() is not None
+
+
+def reference_fingerprint() -> str:
+    """
+    설정된 참고치 표 내용의 해시 (미설정이거나 읽을 수 없으면 "none").
+
+    참고치 컬럼이 포함된 응답의 ETag에 넣어, 표가 교체되면 캐시가 무효화되도록 합니다.
+    예외를 던지지 않으므로 참고치를 쓰지 않는 내보내기에 영향을 주지 않습니다.
+    """
+    configured = _configured_reference()
+    return configured[1] if configured is not None else "none"
+
+
+def get_pediatric_reference(path: Optional[str] = None) -> PediatricReference:
+    """
+    참고치 표를 한 번만 읽어 재사용합니다.
+
+    Args:
+        path: 참고치 CSV 경로 (None이면 AIVISQ_PEDIATRIC_REFERENCE)
+
+    Raises:
+        RuntimeError: 경로가 주어지지 않았고 설정된 표도 없거나 읽을 수 없는 경우
+    """
+    if path is None:
+        configured = _configured_reference()
+        if configured is None:
+            raise RuntimeError(
+                f"소아 참고치 표가 설정되지 않았거나 읽을 수 없습니다 (환경 변수 {REFERENCE_PATH_ENV})."
+            )
+        return configured[0]
+    stat = os.stat(path)
+    return _load_reference(path, stat.st_mtime_ns, stat.st_size)[0]
+
+
+def score_cohort(
+    sex: Sequence[str],
+    age_years: Sequence[float],
+    weight_kg: Sequence[float],
+    liver_volume_ml: Sequence[Optional[float]],
+    spleen_volume_ml: Sequence[Optional[float]],
+    reference: Optional[PediatricReference] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    코호트 전체의 LSVR, z-score, 백분위 순위를 한 번에 계산합니다.
+
+    값이 없거나 계산할 수 없는 항목은 NaN으로 반환합니다.
+
+    Args:
+        sex: 성별 ("M"/"F")
+        age_years: 나이 (년)
+        weight_kg: 체중 (kg)
+        liver_volume_ml: 간 부피 (mL)
+        spleen_volume_ml: 비장 부피 (mL)
+        reference: 참고치 표 (None이면 AIVISQ_PEDIATRIC_REFERENCE로 설정된 표)
+
+    Returns:
+        {"lsvr", "<measure>_z", "<measure>_percentile", "<measure>_p50"} → (N,) 배열
+        measure: liver_volume_ml, spleen_volume_ml, lsvr
+    """
+    if reference is None:
+        reference = get_pediatric_reference()
+
+    sex_array = np.char.upper(np.asarray(sex, dtype=str))
+    age = np.asarray(age_years, dtype=np.float64)
+    weight = np.asarray(weight_kg, dtype=np.float64)
+    liver = np.asarray(liver_volume_ml, dtype=np.float64)
+    spleen = np.asarray(spleen_volume_ml, dtype=np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lsvr = np.where(spleen > 0, liver / spleen, np.nan)
+
+    results: Dict[str, np.ndarray] = {"lsvr": lsvr}
+    for measure, values in (("liver_volume_ml", liver), ("spleen_volume_ml", spleen), ("lsvr", lsvr)):
+        knots = reference.percentiles(measure, sex_array, age, weight)
+        z = _z_scores(values, knots)
+        results[f"{measure}_z"] = z
+        results[f"{measure}_percentile"] = ndtr(z) * 100.0
+        results[f"{measure}_p50"] = knots[:, 2]
+    return results
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 100_000
+    reference = get_pediatric_reference(PLACEHOLDER_REFERENCE_PATH)
+    cohort = dict(
+        sex=rng.choice(["M", "F"], n),
+        age_years=rng.uniform(0, 18, n),
+        weight_kg=rng.uniform(3, 90, n),
+        liver_volume_ml=rng.normal(1350, 200, n),
+        spleen_volume_ml=rng.normal(175, 50, n),
+    )
+    start = time.perf_counter()
+    score_cohort(**cohort, reference=reference)
+    print(f"{n} patients scored in {time.perf_counter() - start:.3f}s")
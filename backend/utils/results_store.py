@@ -0,0 +1,291 @@
+"""
+분석 결과 저장소 (SQLite)
+
+CSV_COLUMNS 스키마 그대로 장기별 분석 결과를 로컬 SQLite에 저장하고,
+조건 조회와 장기/그룹별 집계(개수, 평균, 백분위수)를 제공합니다.
+
+(patient_id, study_id, organ)은 고유 키이므로 같은 검사를 다시 내보내면 덮어씁니다.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from models.schemas import CSV_COLUMNS
+
+
+DEFAULT_RESULTS_DB_PATH = os.environ.get(
+    "AIVISQ_RESULTS_DB",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "data",
+        "results.sqlite3",
+    ),
+)
+
+_TABLE = "organ_results"
+_TEXT_COLUMNS = ("patient_id", "study_id", "organ")
+NUMERIC_COLUMNS = [c for c in CSV_COLUMNS if c not in _TEXT_COLUMNS]
+_ALL_COLUMNS = list(CSV_COLUMNS) + ["study_date"]
+
+# 집계 시 organ 외에 추가로 허용하는 그룹 기준 (이름 → SQL 식)
+GROUP_BY_EXPRESSIONS = {
+    "patient_id": '"patient_id"',
+    "study_id": '"study_id"',
+    "study_month": 'substr("study_date", 1, 7)',
+    "study_year": 'substr("study_date", 1, 4)',
+}
+
+
+def _quote(column: str) -> str:
+    """SQL 식별자를 따옴표로 감쌉니다 (컬럼명에 대문자가 포함됨)."""
+    return '"' + column.replace('"', '""') + '"'
+
+
+class ResultsStore:
+    """
+    장기별 분석 결과 SQLite 저장소.
+
+    Args:
+        db_path: SQLite 파일 경로
+    """
+
+    def __init__(self, db_path: str = DEFAULT_RESULTS_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """트랜잭션 단위 연결 (성공 시 commit, 예외 시 rollback)."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        """테이블/인덱스를 만들고, CSV_COLUMNS에 새로 추가된 컬럼을 반영합니다."""
+        column_defs = [f"{_quote(c)} TEXT NOT NULL" for c in _TEXT_COLUMNS]
+        column_defs += [f"{_quote(c)} REAL" for c in NUMERIC_COLUMNS]
+        column_defs += ['"study_date" TEXT', "\"updated_at\" TEXT DEFAULT (datetime('now'))"]
+
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_TABLE} ("
+                + ", ".join(column_defs)
+                + ', UNIQUE ("patient_id", "study_id", "organ"))'
+            )
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({_TABLE})")}
+            for column in NUMERIC_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {_TABLE} ADD COLUMN {_quote(column)} REAL")
+            for column in ("patient_id", "study_id", "organ", "study_date"):
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{_TABLE}_{column} ON {_TABLE} ({_quote(column)})"
+                )
+
+    def upsert_rows(self, rows: Iterable[Dict[str, Any]], batch_size: int = 5000) -> int:
+        """
+        결과 행을 배치 단위로 저장합니다 (하나의 트랜잭션).
+
+        Args:
+            rows: CSV_COLUMNS(+ study_date) 키를 가진 딕셔너리
+            batch_size: executemany 배치 크기
+
+        Returns:
+            저장한 행 수
+        """
+        placeholders = ", ".join("?" for _ in _ALL_COLUMNS)
+        updates = ", ".join(
+            f"{_quote(c)} = excluded.{_quote(c)}" for c in _ALL_COLUMNS if c not in _TEXT_COLUMNS
+        )
+        sql = (
+            f"INSERT INTO {_TABLE} ({', '.join(_quote(c) for c in _ALL_COLUMNS)}) "
+            f"VALUES ({placeholders}) "
+            f'ON CONFLICT ("patient_id", "study_id", "organ") DO UPDATE SET {updates}, '
+            "\"updated_at\" = datetime('now')"
+        )
+
+        count = 0
+        with self._connect() as conn:
+            batch: List[tuple] = []
+            for row in rows:
+                values = [row.get(c) for c in _ALL_COLUMNS]
+                values[1] = values[1] or ""  # study_id: CSV와 동일하게 None → ""
+                batch.append(tuple(values))
+                if len(batch) >= batch_size:
+                    conn.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def upsert_features(
+        self,
+        patient_id: str,
+        study_id: Optional[str],
+        organ_data: Dict[str, Dict[str, Any]],
+        study_date: Optional[str] = None,
+    ) -> int:
+        """
+        장기별 특징 딕셔너리({"liver": {...}, "spleen": {...}})를 저장합니다.
+
+        빈 장기 데이터는 건너뜁니다.
+        """
+        rows = [
+            {**data, "patient_id": patient_id, "study_id": study_id, "organ": organ, "study_date": study_date}
+            for organ, data in organ_data.items()
+            if data
+        ]
+        return self.upsert_rows(rows)
+
+    @staticmethod
+    def _where(filters: Dict[str, Optional[str]]) -> tuple:
+        """값이 주어진 필터만 WHERE 절로 변환합니다."""
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column == "study_date_from":
+                clauses.append('"study_date" >= ?')
+            elif column == "study_date_to":
+                clauses.append('"study_date" <= ?')
+            else:
+                clauses.append(f"{_quote(column)} = ?")
+            params.append(value)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        patient_id: Optional[str] = None,
+        study_id: Optional[str] = None,
+        organ: Optional[str] = None,
+        study_date_from: Optional[str] = None,
+        study_date_to: Optional[str] = None,
+        limit: int = 1000,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        조건에 맞는 결과 행을 반환합니다.
+
+        Returns:
+            CSV_COLUMNS + study_date 키를 가진 딕셔너리 리스트
+        """
+        where, params = self._where({
+            "patient_id": patient_id,
+            "study_id": study_id,
+            "organ": organ,
+            "study_date_from": study_date_from,
+            "study_date_to": study_date_to,
+        })
+        sql = (
+            f"SELECT {', '.join(_quote(c) for c in _ALL_COLUMNS)} FROM {_TABLE}{where} "
+            'ORDER BY "patient_id", "study_id", "organ" LIMIT ? OFFSET ?'
+        )
+        with self._connect() as conn:
+            cursor = conn.execute(sql, params + [limit, offset])
+            return [dict(zip(_ALL_COLUMNS, row)) for row in cursor]
+
+    def aggregate(
+        self,
+        column: str,
+        group_by: Optional[str] = None,
+        percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+        organ: Optional[str] = None,
+        study_date_from: Optional[str] = None,
+        study_date_to: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        장기(및 선택 그룹)별 개수/평균/표준편차/백분위수를 계산합니다.
+
+        Args:
+            column: 집계할 수치 컬럼 (NUMERIC_COLUMNS 중 하나)
+            group_by: 추가 그룹 기준 (GROUP_BY_EXPRESSIONS 키)
+            percentiles: 계산할 백분위수
+            organ: 장기 필터
+
+        Returns:
+            그룹별 집계 딕셔너리 리스트
+
+        Raises:
+            ValueError: 지원하지 않는 컬럼 또는 그룹 기준
+        """
+        if column not in NUMERIC_COLUMNS:
+            raise ValueError(f"집계할 수 없는 컬럼입니다: {column}")
+        if group_by is not None and group_by not in GROUP_BY_EXPRESSIONS:
+            raise ValueError(f"지원하지 않는 그룹 기준입니다: {group_by}")
+
+        where, params = self._where({
+            "organ": organ,
+            "study_date_from": study_date_from,
+            "study_date_to": study_date_to,
+        })
+        where += (" AND " if where else " WHERE ") + f"{_quote(column)} IS NOT NULL"
+        group_expr = GROUP_BY_EXPRESSIONS[group_by] if group_by else "NULL"
+
+        # 그룹 순으로 정렬된 값을 한 번에 읽은 뒤, 그룹 경계/정렬/백분위수를 모두 벡터 연산으로 계산
+        # (그룹별 파이썬 반복 없이 patient_id처럼 그룹이 많은 경우도 한 번의 정렬로 처리)
+        sql = (
+            f'SELECT "organ", {group_expr} AS grp, {_quote(column)} FROM {_TABLE}{where} '
+            f'ORDER BY "organ", grp'
+        )
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        if not rows:
+            return []
+
+        organ_column, group_column, value_column = zip(*rows)
+        organs = np.array(organ_column, dtype=object)
+        groups = np.array(group_column, dtype=object)
+        values = np.array(value_column, dtype=np.float64)
+
+        is_start = np.ones(len(values), dtype=bool)
+        is_start[1:] = (organs[1:] != organs[:-1]) | (groups[1:] != groups[:-1])
+        starts = np.flatnonzero(is_start)
+        counts = np.diff(np.append(starts, len(values)))
+        # 그룹 번호를 1차 키로 값을 정렬 → 각 그룹 구간 [start, start + count)이 오름차순
+        group_ids = np.cumsum(is_start) - 1
+        values = values[np.lexsort((values, group_ids))]
+
+        means = np.add.reduceat(values, starts) / counts
+        deviations = values - np.repeat(means, counts)
+        stds = np.sqrt(np.add.reduceat(deviations * deviations, starts) / counts)
+
+        # np.percentile(linear)과 같은 보간: 그룹 내 위치 (n-1)*q/100
+        q = np.asarray(percentiles, dtype=np.float64) / 100.0
+        positions = starts[:, None] + (counts[:, None] - 1) * q[None, :]
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.ceil(positions).astype(np.int64)
+        quantiles = values[lower] + (values[upper] - values[lower]) * (positions - lower)
+
+        labels = [f"p{p:g}" for p in percentiles]
+        results = []
+        for organ_name, group, count, mean, std, row in zip(
+            organs[starts].tolist(), groups[starts].tolist(),
+            counts.tolist(), means.tolist(), stds.tolist(), quantiles.tolist(),
+        ):
+            entry: Dict[str, Any] = {"organ": organ_name}
+            if group_by:
+                entry[group_by] = group
+            entry.update({"count": count, "mean": mean, "std": std})
+            entry.update(zip(labels, row))
+            results.append(entry)
+        return results
+
+
+@lru_cache(maxsize=None)
+def get_results_store(db_path: str = DEFAULT_RESULTS_DB_PATH) -> ResultsStore:
+    """경로별 저장소 인스턴스를 재사용합니다."""
+    return ResultsStore(db_path)
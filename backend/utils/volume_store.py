@@ -0,0 +1,291 @@
+"""
+디코딩된 볼륨 저장소
+
+업로드된 .nii.gz를 한 번만 압축 해제하여 콘텐츠 해시 기준으로 비압축 .npy로
+저장하고, 이후 재분석 시에는 메모리 매핑으로 즉시 불러옵니다.
+
+저장 구조 (키 = 원본 파일 SHA-256):
+    <root>/<key>.npy   : 비압축 볼륨 (np.load(mmap_mode="r")로 매핑)
+    <root>/<key>.json  : spacing, affine, shape, dtype, 무결성 정보
+
+디스크 사용량이 quota를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import nibabel as nib
+
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_FORMAT_VERSION = 1
+
+# 메타데이터 없는 .npy / 임시 파일을 고아로 보고 삭제하기까지의 유예 시간 (기록 중인 파일 보호)
+_ORPHAN_GRACE_SECONDS = 600
+
+
+def compute_content_key(path: str) -> str:
+    """
+    파일 내용의 SHA-256 해시를 계산합니다.
+
+    Args:
+        path: 원본 파일 경로
+
+    Returns:
+        16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_array(array: np.ndarray) -> str:
+    """배열 데이터의 SHA-256 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    flat = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+    for start in range(0, flat.size, _HASH_CHUNK_SIZE):
+        digest.update(flat[start:start + _HASH_CHUNK_SIZE])
+    return digest.hexdigest()
+
+
+def _decode_nifti_data(img: "nib.spatialimages.SpatialImage") -> np.ndarray:
+    """
+    NIfTI 데이터를 가능한 한 작은 dtype으로 디코딩합니다.
+
+    scl_slope/scl_inter가 설정되면 nibabel은 float64로 변환하므로, 기울기/절편이 정수이고
+    결과가 int16 범위에 들어가면 int16으로 변환합니다 (CT: uint16 원시값 + scl_inter=-1024).
+    그 외의 스케일링은 float32로 저장합니다.
+    """
+    proxy = img.dataobj
+    if not hasattr(proxy, "get_unscaled"):
+        return np.asanyarray(proxy)
+
+    slope = float(proxy.slope)
+    inter = float(proxy.inter)
+    raw = np.asarray(proxy.get_unscaled())
+    if slope == 1.0 and inter == 0.0:
+        return raw
+
+    if slope.is_integer() and inter.is_integer() and raw.dtype.kind in "iu":
+        low, high = sorted((float(raw.min()) * slope + inter, float(raw.max()) * slope + inter))
+        if low >= np.iinfo(np.int16).min and high <= np.iinfo(np.int16).max:
+            scaled = raw.astype(np.int32)
+            if slope != 1.0:
+                scaled *= np.int32(slope)
+            scaled += np.int32(inter)
+            return scaled.astype(np.int16)
+
+    return img.get_fdata(dtype=np.float32)
+
+
+class VolumeStore:
+    """
+    콘텐츠 해시 기반의 비압축 볼륨 캐시.
+
+    Args:
+        root_dir: 저장 디렉터리
+        quota_bytes: 최대 디스크 사용량 (바이트)
+    """
+
+    def __init__(self, root_dir: str, quota_bytes: int = 20 * 1024 ** 3):
+        self.root_dir = root_dir
+        self.quota_bytes = quota_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _data_path(self, key: str) -> str:
+        return os.path.join(self.root_dir, f"{key}.npy")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.root_dir, f"{key}.json")
+
+    def contains(self, key: str) -> bool:
+        """키에 해당하는 볼륨이 저장되어 있는지 확인합니다."""
+        return os.path.exists(self._meta_path(key)) and os.path.exists(self._data_path(key))
+
+    def put_nifti(self, nifti_path: str, key: Optional[str] = None) -> str:
+        """
+        NIfTI 파일을 디코딩하여 저장합니다. 이미 저장된 경우 디코딩을 생략합니다.
+
+        Args:
+            nifti_path: .nii 또는 .nii.gz 파일 경로
+            key: 미리 계산한 콘텐츠 해시 (None이면 계산)
+
+        Returns:
+            저장소 키
+        """
+        if key is None:
+            key = compute_content_key(nifti_path)
+
+        if self.contains(key):
+            self._touch(key)
+            return key
+
+        img = nib.load(nifti_path)
+        data = _decode_nifti_data(img)
+        metadata = {
+            "version": _FORMAT_VERSION,
+            "shape": list(data.shape),
+            "dtype": data.dtype.str,
+            "voxel_spacing": [float(z) for z in img.header.get_zooms()[:3]],
+            "affine": img.affine.tolist(),
+            "axis_codes": list(nib.aff2axcodes(img.affine)),
+            "sha256": _hash_array(data),
+        }
+        self._write(key, data, metadata)
+        self._evict(keep=key)
+        return key
+
+    def _write(self, key: str, data: np.ndarray, metadata: Dict[str, Any]) -> None:
+        """임시 파일에 기록 후 원자적으로 교체합니다 (데이터 → 메타데이터 순서)."""
+        fd, tmp_data = tempfile.mkstemp(dir=self.root_dir, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, data, allow_pickle=False)
+            metadata["nbytes"] = os.path.getsize(tmp_data)
+            os.replace(tmp_data, self._data_path(key))
+        except BaseException:
+            if os.path.exists(tmp_data):
+                os.remove(tmp_data)
+            raise
+
+        fd, tmp_meta = tempfile.mkstemp(dir=self.root_dir, suffix=".json.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_meta, self._meta_path(key))
+
+    def load(self, key: str, verify: bool = False) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        저장된 볼륨을 읽기 전용 메모리 매핑으로 불러옵니다.
+
+        Args:
+            key: 저장소 키
+            verify: True이면 전체 데이터 해시까지 검증 (느림)
+
+        Returns:
+            (메모리 매핑된 볼륨, 메타데이터)
+
+        Raises:
+            KeyError: 저장되지 않은 키
+            ValueError: 무결성 검사 실패 (손상된 항목은 삭제됨)
+        """
+        if not self.contains(key):
+            raise KeyError(key)
+
+        data_path = self._data_path(key)
+        try:
+            # 메타데이터 손상(잘린 JSON, 누락된 필드)도 무결성 실패로 처리하여 다음 호출에서 다시 디코딩
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            if os.path.getsize(data_path) != metadata["nbytes"]:
+                raise ValueError("파일 크기 불일치")
+            data = np.load(data_path, mmap_mode="r", allow_pickle=False)
+            if list(data.shape) != metadata["shape"] or data.dtype.str != metadata["dtype"]:
+                raise ValueError("shape/dtype 불일치")
+            if verify and _hash_array(data) != metadata["sha256"]:
+                raise ValueError("데이터 해시 불일치")
+        except (ValueError, KeyError, TypeError) as e:
+            self.remove(key)
+            raise ValueError(f"볼륨 저장소 항목 손상 ({key}): {e!r}")
+
+        self._touch(key)
+        return data, metadata
+
+    def load_or_decode(self, nifti_path: str) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        NIfTI 파일에 해당하는 볼륨을 저장소에서 불러오고, 없으면 디코딩 후 저장합니다.
+
+        Args:
+            nifti_path: .nii 또는 .nii.gz 파일 경로
+
+        Returns:
+            (메모리 매핑된 볼륨, 메타데이터)
+        """
+        key = compute_content_key(nifti_path)
+        try:
+            return self.load(key)
+        except (KeyError, ValueError):
+            self.put_nifti(nifti_path, key=key)
+            return self.load(key)
+
+    def remove(self, key: str) -> None:
+        """항목을 삭제합니다."""
+        for path in (self._meta_path(key), self._data_path(key)):
+            self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _touch(self, key: str) -> None:
+        """메타데이터 파일의 수정 시각을 갱신하여 LRU 순서를 기록합니다."""
+        try:
+            os.utime(self._meta_path(key))
+        except FileNotFoundError:
+            pass
+
+    def usage_bytes(self) -> int:
+        """현재 디스크 사용량 (바이트)을 반환합니다."""
+        total = 0
+        for entry in os.scandir(self.root_dir):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """
+        quota를 넘으면 마지막 사용 시각이 오래된 항목부터 삭제합니다.
+
+        메타데이터가 없는 고아 .npy와 남은 임시 파일(.tmp)은 기록 중일 수 있으므로
+        유예 시간이 지난 것만 정리합니다.
+
+        Args:
+            keep: 삭제하지 않을 키 (방금 저장한 항목)
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            total = 0
+            for entry in os.scandir(self.root_dir):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                name = entry.name
+                if name.endswith(".npy") and os.path.exists(self._meta_path(name[:-len(".npy")])):
+                    continue  # 아래 .json 항목에서 함께 집계
+                if name.endswith(".tmp") or name.endswith(".npy"):
+                    if now - stat.st_mtime > _ORPHAN_GRACE_SECONDS:
+                        self._remove_file(entry.path)
+                    else:
+                        total += stat.st_size
+                    continue
+                if not name.endswith(".json"):
+                    total += stat.st_size
+                    continue
+
+                key = name[:-len(".json")]
+                data_path = self._data_path(key)
+                size = stat.st_size
+                if os.path.exists(data_path):
+                    size += os.path.getsize(data_path)
+                entries.append((stat.st_mtime, key, size))
+                total += size
+
+            entries.sort()
+            for _, key, size in entries:
+                if total <= self.quota_bytes:
+                    break
+                if key == keep:
+                    continue
+                self.remove(key)
+                total -= size
@@ -75,12 +75,23 @@ export interface RadiomicsFeatures {
   glszm_ze: number | null;
 }
 
+// 형태 특징 타입
+export interface ShapeFeatures {
+  surface_area_mm2: number | null;
+  sphericity: number | null;
+  max_diameter_mm: number | null;
+  major_axis_mm: number | null;
+  minor_axis_mm: number | null;
+  least_axis_mm: number | null;
+}
+
 // 장기별 분석 특징 타입
 export interface OrganFeatures {
   organ: 'liver' | 'spleen';
   volume_ml: number | null;
   hu_stats: HUStatistics | null;
   radiomics: RadiomicsFeatures | null;
+  shape?: ShapeFeatures | null;
 }
 
 // CSV 내보내기 요청 타입
@@ -98,6 +109,12 @@ export interface CSVExportData {
   liver_glcm_homogeneity?: number | null;
   liver_glrlm_lre?: number | null;
   liver_glszm_ze?: number | null;
+  liver_surface_area_mm2?: number | null;
+  liver_sphericity?: number | null;
+  liver_max_diameter_mm?: number | null;
+  liver_major_axis_mm?: number | null;
+  liver_minor_axis_mm?: number | null;
+  liver_least_axis_mm?: number | null;
   spleen_volume_ml?: number | null;
   spleen_mean_hu?: number | null;
   spleen_std_hu?: number | null;
@@ -109,6 +126,12 @@ export interface CSVExportData {
   spleen_glcm_homogeneity?: number | null;
   spleen_glrlm_lre?: number | null;
   spleen_glszm_ze?: number | null;
+  spleen_surface_area_mm2?: number | null;
+  spleen_sphericity?: number | null;
+  spleen_max_diameter_mm?: number | null;
+  spleen_major_axis_mm?: number | null;
+  spleen_minor_axis_mm?: number | null;
+  spleen_least_axis_mm?: number | null;
 }
 
 // CSV 컬럼 정의 (확장 가능한 상수)
@@ -127,6 +150,12 @@ export const CSV_COLUMNS = [
   'GLCM_homogeneity',
   'GLRLM_LRE',
   'GLSZM_ZE',
+  'surface_area_mm2',
+  'sphericity',
+  'max_diameter_mm',
+  'major_axis_mm',
+  'minor_axis_mm',
+  'least_axis_mm',
 ] as const;
 
 
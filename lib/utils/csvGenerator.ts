@@ -42,6 +42,12 @@ function createRow(
     GLCM_homogeneity?: number | null;
     GLRLM_LRE?: number | null;
     GLSZM_ZE?: number | null;
+    surface_area_mm2?: number | null;
+    sphericity?: number | null;
+    max_diameter_mm?: number | null;
+    major_axis_mm?: number | null;
+    minor_axis_mm?: number | null;
+    least_axis_mm?: number | null;
   }
 ): string[] {
   return [
@@ -59,6 +65,12 @@ function createRow(
     formatValue(data.GLCM_homogeneity),
     formatValue(data.GLRLM_LRE),
     formatValue(data.GLSZM_ZE),
+    formatValue(data.surface_area_mm2),
+    formatValue(data.sphericity),
+    formatValue(data.max_diameter_mm),
+    formatValue(data.major_axis_mm),
+    formatValue(data.minor_axis_mm),
+    formatValue(data.least_axis_mm),
   ];
 }
 
@@ -85,6 +97,12 @@ export function generateCSVContent(data: CSVExportData): string {
       GLCM_homogeneity: data.liver_glcm_homogeneity,
       GLRLM_LRE: data.liver_glrlm_lre,
       GLSZM_ZE: data.liver_glszm_ze,
+      surface_area_mm2: data.liver_surface_area_mm2,
+      sphericity: data.liver_sphericity,
+      max_diameter_mm: data.liver_max_diameter_mm,
+      major_axis_mm: data.liver_major_axis_mm,
+      minor_axis_mm: data.liver_minor_axis_mm,
+      least_axis_mm: data.liver_least_axis_mm,
     }));
   }
   
@@ -102,6 +120,12 @@ export function generateCSVContent(data: CSVExportData): string {
       GLCM_homogeneity: data.spleen_glcm_homogeneity,
       GLRLM_LRE: data.spleen_glrlm_lre,
       GLSZM_ZE: data.spleen_glszm_ze,
+      surface_area_mm2: data.spleen_surface_area_mm2,
+      sphericity: data.spleen_sphericity,
+      max_diameter_mm: data.spleen_max_diameter_mm,
+      major_axis_mm: data.spleen_major_axis_mm,
+      minor_axis_mm: data.spleen_minor_axis_mm,
+      least_axis_mm: data.spleen_least_axis_mm,
     }));
   }
   
@@ -171,6 +195,12 @@ export async function downloadCSVFromAPI(data: CSVExportData): Promise<void> {
   if (data.liver_glcm_homogeneity != null) params.append('liver_glcm_homogeneity', String(data.liver_glcm_homogeneity));
   if (data.liver_glrlm_lre != null) params.append('liver_glrlm_lre', String(data.liver_glrlm_lre));
   if (data.liver_glszm_ze != null) params.append('liver_glszm_ze', String(data.liver_glszm_ze));
+  if (data.liver_surface_area_mm2 != null) params.append('liver_surface_area_mm2', String(data.liver_surface_area_mm2));
+  if (data.liver_sphericity != null) params.append('liver_sphericity', String(data.liver_sphericity));
+  if (data.liver_max_diameter_mm != null) params.append('liver_max_diameter_mm', String(data.liver_max_diameter_mm));
+  if (data.liver_major_axis_mm != null) params.append('liver_major_axis_mm', String(data.liver_major_axis_mm));
+  if (data.liver_minor_axis_mm != null) params.append('liver_minor_axis_mm', String(data.liver_minor_axis_mm));
+  if (data.liver_least_axis_mm != null) params.append('liver_least_axis_mm', String(data.liver_least_axis_mm));
   
   // 비장 데이터
   if (data.spleen_volume_ml != null) params.append('spleen_volume_ml', String(data.spleen_volume_ml));
@@ -184,6 +214,12 @@ export async function downloadCSVFromAPI(data: CSVExportData): Promise<void> {
   if (data.spleen_glcm_homogeneity != null) params.append('spleen_glcm_homogeneity', String(data.spleen_glcm_homogeneity));
   if (data.spleen_glrlm_lre != null) params.append('spleen_glrlm_lre', String(data.spleen_glrlm_lre));
   if (data.spleen_glszm_ze != null) params.append('spleen_glszm_ze', String(data.spleen_glszm_ze));
+  if (data.spleen_surface_area_mm2 != null) params.append('spleen_surface_area_mm2', String(data.spleen_surface_area_mm2));
+  if (data.spleen_sphericity != null) params.append('spleen_sphericity', String(data.spleen_sphericity));
+  if (data.spleen_max_diameter_mm != null) params.append('spleen_max_diameter_mm', String(data.spleen_max_diameter_mm));
+  if (data.spleen_major_axis_mm != null) params.append('spleen_major_axis_mm', String(data.spleen_major_axis_mm));
+  if (data.spleen_minor_axis_mm != null) params.append('spleen_minor_axis_mm', String(data.spleen_minor_axis_mm));
+  if (data.spleen_least_axis_mm != null) params.append('spleen_least_axis_mm', String(data.spleen_least_axis_mm));
 
   try {
     const response = await fetch(